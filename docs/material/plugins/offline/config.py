@@ -20,7 +20,7 @@
 #   IN THE SOFTWARE.
 # #
 
-from mkdocs.config.config_options import Type
+from mkdocs.config.config_options import Choice, ListOfItems, Type
 from mkdocs.config.base import Config
 
 # -----------------------------------------------------------------------------
@@ -30,3 +30,6 @@ from mkdocs.config.base import Config
 # Offline plugin configuration
 class OfflineConfig(Config):
     enabled = Type(bool, default = True)
+
+    # Settings for compression
+    compress = ListOfItems(Choice(("gzip", "brotli")), default = [])
@@ -22,8 +22,11 @@
 
 import os
 
+from concurrent.futures import ThreadPoolExecutor
+from mkdocs.exceptions import PluginError
 from mkdocs.plugins import BasePlugin, event_priority
 
+from ..search.compress import brotli, compress
 from .config import OfflineConfig
 
 # -----------------------------------------------------------------------------
@@ -33,11 +36,24 @@ from .config import OfflineConfig
 # Offline plugin
 class OfflinePlugin(BasePlugin[OfflineConfig]):
 
+    # Initialize thread pool for compression
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool = ThreadPoolExecutor(1)
+        self.pool_jobs = []
+
     # Set configuration for offline build
     def on_config(self, config):
         if not self.config.enabled:
             return
 
+        # Check dependencies for compressing the search index
+        if "brotli" in self.config.compress and not brotli:
+            raise PluginError(
+                "Required dependencies for \"offline.compress\" not found. "
+                "Install with: pip install brotli"
+            )
+
         # Ensure correct resolution of links when viewing the site from the
         # file system by disabling directory URLs
         config.use_directory_urls = False
@@ -65,7 +81,32 @@ class OfflinePlugin(BasePlugin[OfflineConfig]):
         with open(file, encoding = "utf-8") as f:
             data = f.read()
 
+        # Reconcile compression jobs of previous build, if any
+        self._reconcile()
+
         # Inline search index contents into script
         file = os.path.join(path, "search_index.js")
         with open(file, "w", encoding = "utf-8") as f:
             f.write(f"var __index = {data}")
+
+        # Compress script in a separate thread while the build finishes, if
+        # enabled - jobs are reconciled on shutdown or before the next build
+        if self.config.compress:
+            self.pool_jobs.append(self.pool.submit(
+                compress, [file], self.config.compress
+            ))
+
+    # Reconcile compression jobs and shut down thread pool
+    def on_shutdown(self):
+        self._reconcile()
+        self.pool.shutdown()
+
+    # -------------------------------------------------------------------------
+
+    # Reconcile compression jobs, raising errors, if any
+    def _reconcile(self):
+        for job in self.pool_jobs:
+            job.result()
+
+        # Clear jobs
+        self.pool_jobs.clear()
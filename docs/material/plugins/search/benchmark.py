@@ -0,0 +1,324 @@
+# #
+#   Copyright (c) 2025 Aetherinox
+#
+#   Permission is hereby granted, free of charge, to any person obtaining a copy
+#   of this software and associated documentation files (the "Software"), to
+#   deal in the Software without restriction, including without limitation the
+#   rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#   sell copies of the Software, and to permit persons to whom the Software is
+#   furnished to do so, subject to the following conditions:
+#
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON-INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#   IN THE SOFTWARE.
+# #
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from html import escape
+from mkdocs.structure.toc import get_toc
+from types import SimpleNamespace
+
+from .config import SearchConfig
+from .plugin import FastParser, Parser, SearchIndex
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# -----------------------------------------------------------------------------
+# Functions
+# -----------------------------------------------------------------------------
+
+# Benchmark search indexing on a synthetic corpus of rendered pages, driving
+# the search index directly without a full MkDocs build, and report pages per
+# second, peak memory and output size - run with:
+#
+#   python -m material.plugins.search.benchmark --pages 1000
+#
+# With --memory, only the parser is run, and the memory it allocates while
+# parsing and retains afterwards is reported per MB of HTML. With --load, the
+# output is retained and parsed as JSON, which approximates the time it takes
+# the client to load the search index. With --headings, each page has exactly
+# the given number of headings, and only a single page is generated, unless
+# --pages is given, which guards per-page costs like mapping the table of
+# contents against regressions on a deep page, e.g., --headings 1000.
+def main(argv = None):
+    parser = argparse.ArgumentParser(
+        prog = "python -m material.plugins.search.benchmark",
+        description = "Benchmark search indexing on a synthetic corpus."
+    )
+    parser.add_argument("--pages", type = int)
+    parser.add_argument("--headings", type = int)
+    parser.add_argument("--seed", type = int, default = 1)
+    parser.add_argument("--parser", choices = ["default", "fast"], default = "default")
+    parser.add_argument("--concurrency", type = int, default = 1)
+    parser.add_argument("--compact", action = "store_true")
+    parser.add_argument("--plain", action = "store_true")
+    parser.add_argument("--memory", action = "store_true")
+    parser.add_argument("--load", action = "store_true")
+    args = parser.parse_args(argv)
+
+    # Generate a single deep page, if the number of headings is given
+    if args.pages is None:
+        args.pages = 1 if args.headings else 1000
+
+    # Generate corpus, which is not part of the measurement
+    rng = random.Random(args.seed)
+    pages = [
+        generate_page(rng, index, args.headings)
+            for index in range(args.pages)
+    ]
+    size = sum(len(page.content.encode("utf-8")) for page in pages)
+
+    # Measure memory of parser, if enabled
+    if args.memory:
+        peak, retained = measure_memory(
+            FastParser if args.parser == "fast" else Parser, pages
+        )
+        return report([
+            ("Pages", f"{args.pages}"),
+            ("Content", f"{size / 1e6:.2f} MB"),
+            ("Peak", f"{peak / size:.2f} MB per MB of HTML"),
+            ("Retained", f"{retained / size:.2f} MB per MB of HTML")
+        ])
+
+    # Load configuration with defaults, caching disabled
+    config = SearchConfig()
+    config.load_dict({
+        "lang": ["en"],
+        "separator": r"[\s\-]+",
+        "pipeline": ["stemmer", "stopWordFilter", "trimmer"],
+        "parser": args.parser,
+        "concurrency": args.concurrency,
+        "compact": args.compact,
+        "plain": args.plain,
+        "cache": False
+    })
+    errors, _ = config.validate()
+    for key, error in errors:
+        parser.error(f"{key}: {error}")
+
+    # Divide pages into sections and create entries
+    index = SearchIndex(**config)
+    start = time.perf_counter()
+    for page in pages:
+        index.add_entry_from_context(page)
+
+    # Generate search index, counting bytes instead of writing to a file -
+    # if concurrency is enabled, this includes waiting for the worker jobs.
+    # If the compact format is enabled, it is measured instead.
+    middle = time.perf_counter()
+    generator = index.generate_search_index(None)
+    if args.compact:
+        for _ in generator:
+            pass
+
+        # Generate search index in compact format
+        generator = index.generate_search_index_compact()
+
+    # Count bytes, and retain chunks for loading, if enabled
+    chunks = []
+    output = 0
+    for chunk in generator:
+        output += len(chunk.encode("utf-8"))
+        if args.load:
+            chunks.append(chunk)
+
+    # Collect results
+    end = time.perf_counter()
+    rows = [
+        ("Pages", f"{args.pages}"),
+        ("Headings", f"{sum(_headings(page.toc) for page in pages)}"),
+        ("Content", f"{size / 1e6:.2f} MB"),
+        ("Indexing", f"{middle - start:.3f} s"),
+        ("Generation", f"{end - middle:.3f} s"),
+        ("Throughput", f"{args.pages / (end - start):.1f} pages/s"),
+        ("Peak RSS", _peak_rss()),
+        ("Output", f"{output / 1e6:.2f} MB")
+    ]
+
+    # Parse output as JSON, if enabled, which is not part of the throughput
+    if args.load:
+        data = "".join(chunks)
+        start = time.perf_counter()
+        json.loads(data)
+        rows.append(("Loading", f"{time.perf_counter() - start:.3f} s"))
+
+    # Report results
+    report(rows)
+
+# Measure memory allocated by the given parser while parsing each page, as
+# well as memory retained by the parser after parsing each page, in bytes
+def measure_memory(cls, pages):
+    peak, retained = 0, 0
+
+    # Parse pages one by one, resetting the peak for each page
+    tracemalloc.start()
+    for page in pages:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+
+        # Parse page
+        parser = cls()
+        parser.feed(page.content)
+        parser.close()
+
+        # Compute memory allocated while parsing and retained afterwards
+        current, top = tracemalloc.get_traced_memory()
+        peak += top - base
+        retained += current - base
+        del parser
+
+    # Stop tracing and return results
+    tracemalloc.stop()
+    return peak, retained
+
+# Report results as a table
+def report(rows):
+    width = max(len(key) for key, _ in rows)
+    for key, value in rows:
+        sys.stdout.write(f"{key.ljust(width)}  {value}\n")
+
+# -----------------------------------------------------------------------------
+
+# Generate rendered page with a deep heading tree, code blocks, tables,
+# regions excluded from search and Han text, together with its table of
+# contents, in the shape the search index expects - if the number of headings
+# is not given, a random number of headings is generated
+def generate_page(rng, index, headings = None):
+    content, toc, stack = [], [], []
+
+    # Generate sections with headings of random depth
+    for position in range(headings or rng.randint(1, 20)):
+        level = 1 if not position else rng.randint(2, 6)
+        anchor = f"section-{position}"
+        title = _words(rng, rng.randint(1, 6))
+        content.append(
+            f"<h{level} id=\"{anchor}\">{escape(title)}"
+            f"<a class=\"headerlink\" href=\"#{anchor}\">&para;</a>"
+            f"</h{level}>"
+        )
+
+        # Add heading to table of contents
+        token = { "level": level, "id": anchor, "name": title, "children": [] }
+        while stack and stack[-1]["level"] >= level:
+            stack.pop()
+        (stack[-1]["children"] if stack else toc).append(token)
+        stack.append(token)
+
+        # Add blocks to section
+        for _ in range(rng.randint(1, 6)):
+            content.append(_block(rng))
+
+    # Return page
+    return SimpleNamespace(
+        url = f"section-{index % 10}/page-{index}/",
+        title = f"Page {index}",
+        content = "\n".join(content),
+        toc = get_toc(toc),
+        meta = { "tags": [_words(rng, 1)] } if rng.random() < 0.3 else {},
+        ancestors = []
+    )
+
+# -----------------------------------------------------------------------------
+
+# Generate block of content
+def _block(rng):
+    kind = rng.random()
+
+    # Generate code block with line numbers
+    if kind < 0.15:
+        lines = [_words(rng, rng.randint(2, 12)) for _ in range(rng.randint(5, 80))]
+        numbers = "\n".join(str(line) for line in range(1, len(lines) + 1))
+        return (
+            "<table class=\"highlighttable\"><tr>"
+            f"<td class=\"linenos\"><div class=\"linenodiv\"><pre>{numbers}</pre></div></td>"
+            f"<td class=\"code\"><pre><code>{escape(chr(10).join(lines))}</code></pre></td>"
+            "</tr></table>"
+        )
+
+    # Generate table
+    if kind < 0.3:
+        rows = "".join(
+            "<tr>" + "".join(
+                f"<td>{_words(rng, rng.randint(1, 4))}</td>" for _ in range(4)
+            ) + "</tr>"
+                for _ in range(rng.randint(2, 20))
+        )
+        return f"<table><thead><tr><th>A</th><th>B</th></tr></thead>{rows}</table>"
+
+    # Generate region excluded from search
+    if kind < 0.4:
+        return f"<div data-search-exclude><p>{_words(rng, 40)}</p></div>"
+
+    # Generate list
+    if kind < 0.55:
+        items = "".join(
+            f"<li><code>{_words(rng, 1)}</code> {_words(rng, 8)}</li>"
+                for _ in range(rng.randint(2, 10))
+        )
+        return f"<ul>{items}</ul>"
+
+    # Generate paragraph with Han text
+    if kind < 0.65:
+        return f"<p>{_words(rng, 10)} {_han(rng, 30)} {_words(rng, 10)}</p>"
+
+    # Generate paragraph
+    return f"<p>{_words(rng, rng.randint(10, 120))}</p>"
+
+# Generate random words
+def _words(rng, count):
+    return " ".join(rng.choice(words) for _ in range(count))
+
+# Generate random Han text
+def _han(rng, count):
+    return "".join(chr(rng.randint(0x4e00, 0x4fff)) for _ in range(count))
+
+# Count headings in table of contents
+def _headings(toc):
+    return sum(1 + _headings(toc_item.children) for toc_item in toc)
+
+# Retrieve peak resident set size, which is reported in kilobytes on Linux,
+# but in bytes on macOS, and is not available on Windows
+def _peak_rss():
+    if not resource:
+        return "n/a"
+
+    # Normalize to megabytes
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return f"{usage / 1e6:.1f} MB"
+    else:
+        return f"{usage / 1e3:.1f} MB"
+
+# -----------------------------------------------------------------------------
+# Data
+# -----------------------------------------------------------------------------
+
+# Words for synthetic text
+words = [
+    "build", "cache", "configuration", "deploy", "document", "element",
+    "index", "language", "markdown", "navigation", "page", "plugin",
+    "render", "search", "section", "server", "site", "table", "theme",
+    "token", "value", "version", "warning", "worker"
+]
+
+# -----------------------------------------------------------------------------
+
+# Run benchmark
+if __name__ == "__main__":
+    main()
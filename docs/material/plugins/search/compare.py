@@ -0,0 +1,180 @@
+# #
+#   Copyright (c) 2025 Aetherinox
+#
+#   Permission is hereby granted, free of charge, to any person obtaining a copy
+#   of this software and associated documentation files (the "Software"), to
+#   deal in the Software without restriction, including without limitation the
+#   rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#   sell copies of the Software, and to permit persons to whom the Software is
+#   furnished to do so, subject to the following conditions:
+#
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON-INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#   IN THE SOFTWARE.
+# #
+
+import argparse
+import random
+import sys
+
+from .benchmark import generate_page
+from .config import SearchConfig
+from .plugin import FastParser, Parser, SearchIndex
+
+# -----------------------------------------------------------------------------
+# Functions
+# -----------------------------------------------------------------------------
+
+# Check that the default and the fast parser engine yield exactly the same
+# sections on a differential corpus of synthetic pages, hand-written edge cases
+# and fuzzed fragments, and that the search index generated with each engine is
+# byte for byte identical - exits with a non-zero status on mismatch, run with:
+#
+#   python -m material.plugins.search.compare
+def main(argv = None):
+    parser = argparse.ArgumentParser(
+        prog = "python -m material.plugins.search.compare",
+        description = "Compare the default and the fast parser engine."
+    )
+    parser.add_argument("--pages", type = int, default = 300)
+    parser.add_argument("--fragments", type = int, default = 20000)
+    parser.add_argument("--seed", type = int, default = 1)
+    args = parser.parse_args(argv)
+
+    # Generate corpus
+    rng = random.Random(args.seed)
+    pages = [generate_page(rng, index) for index in range(args.pages)]
+    fragments = [_fragment(rng) for _ in range(args.fragments)]
+
+    # Compare sections of each document
+    failures = 0
+    documents = [page.content for page in pages] + cases + fragments
+    for html in documents:
+        expected = compare_sections(Parser, html)
+        actual   = compare_sections(FastParser, html)
+        if expected != actual:
+            failures += 1
+            if failures <= 5:
+                sys.stdout.write(
+                    f"Mismatch: {html!r}\n"
+                    f"  default: {expected!r}\n"
+                    f"  fast:    {actual!r}\n"
+                )
+
+    # Compare search index of corpus
+    expected = compare_search_index("default", pages)
+    actual   = compare_search_index("fast", pages)
+    if expected != actual:
+        failures += 1
+        sys.stdout.write("Mismatch: search index differs\n")
+
+    # Report results
+    sys.stdout.write(
+        f"{failures} mismatches in {len(documents)} documents and "
+        f"{len(pages)} pages\n"
+    )
+    return 1 if failures else 0
+
+# Parse the given string of HTML with the given parser and return its sections
+# in comparable form, or the error that the parser raised
+def compare_sections(cls, html):
+    parser = cls()
+    try:
+        parser.feed(html)
+        parser.close()
+    except ValueError as e:
+        return str(e)
+
+    # Return sections
+    return [
+        (
+            repr(section), section.id, section.depth,
+            section.title, section.text, section.is_excluded()
+        )
+            for section in parser.data
+    ]
+
+# Generate search index of the given pages with the given parser engine
+def compare_search_index(engine, pages):
+    config = SearchConfig()
+    config.load_dict({
+        "lang": ["en"],
+        "separator": r"[\s\-]+",
+        "pipeline": ["stemmer", "stopWordFilter", "trimmer"],
+        "parser": engine,
+        "cache": False
+    })
+    errors, _ = config.validate()
+    if errors:
+        raise ValueError(errors)
+
+    # Create entries and generate search index
+    index = SearchIndex(**config)
+    for page in pages:
+        index.add_entry_from_context(page)
+
+    # Return search index
+    return "".join(index.generate_search_index(None)).encode("utf-8")
+
+# -----------------------------------------------------------------------------
+
+# Generate fragment of HTML from a random sequence of tags and text
+def _fragment(rng):
+    return "".join(
+        rng.choice(fragments) for _ in range(rng.randint(1, 40))
+    )
+
+# -----------------------------------------------------------------------------
+# Data
+# -----------------------------------------------------------------------------
+
+# Hand-written edge cases
+cases = [
+    "<div data-search-exclude><div>inner</div> leak</div> after",
+    "<div class=\"o\"><div data-search-exclude>x</div> y</div>",
+    "<p>x</p><p> </p><p></p>",
+    "<p> <code> </code> </p>",
+    "<ul><li>a<ul><li> </li></ul></li></ul>",
+    "<h2 id=\"a\">A<h2>nested b</h2></h2><p>t</p>",
+    "<h2 id=\"a\" class=\"headerlink\">Install</h2><p>t</p>",
+    "<p>a<h3 id=\"b\">B</h3>c</p><p>d</p>",
+    "<script>x</script><p data-search-exclude>q</p><p>r</p>",
+    "<pre>  a\n\n  b  </pre>  \n  <p>  </p>",
+    "<h1 id=\"t\">T <a class=\"headerlink\" href=\"#\">#</a><a>l</a></h1>text",
+    "<h1 id=\"t\">T <span class=\"headerlink\">s</span></h1>text",
+    "<span data-search-exclude><span>a</span>b</span>c",
+    "<div class=\"linenodiv\"><pre>1</pre></div><p>x</p>",
+    "<p>a</p><p>b<p>c</p>",
+    "</p><p>x",
+    "<li><p>a</p></li><li></li>",
+    "<sub>1</sub><sup></sup>&amp;&lt;x&gt;",
+    "<h3 id=\"q\">no h1</h3><p>x</p>",
+    "<br/><hr><img src=x><div/>t",
+    "<code>a<code>b</code> </code>",
+    "<p>  <p>x</p>",
+    "<style data-search-exclude>a</style>b"
+]
+
+# Fragments to generate fuzzed documents from
+fragments = [
+    "<p>", "</p>", "<code>", "</code>", "<li>", "</li>", "<ul>", "</ul>",
+    "<pre>", "</pre>", "<div>", "</div>", "<div data-search-exclude>",
+    "<div class=\"linenodiv\">", "<h1 id=\"j\">", "</h1>", "<h2 id=\"i\">",
+    "<h2 id=\"k\" class=\"headerlink\">", "</h2>", "<h3>", "</h3>",
+    "<h3 data-search-exclude>", "<a class=\"headerlink\">", "<a>", "</a>",
+    "<span class=\"headerlink\">", "</span>", "<script>", "</script>",
+    "<sub>", "</sub>", "<br>", " ", "\n", "x", "&amp;"
+]
+
+# -----------------------------------------------------------------------------
+
+# Run comparison
+if __name__ == "__main__":
+    sys.exit(main())
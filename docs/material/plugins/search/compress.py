@@ -0,0 +1,67 @@
+# #
+#   Copyright (c) 2025 Aetherinox
+#
+#   Permission is hereby granted, free of charge, to any person obtaining a copy
+#   of this software and associated documentation files (the "Software"), to
+#   deal in the Software without restriction, including without limitation the
+#   rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#   sell copies of the Software, and to permit persons to whom the Software is
+#   furnished to do so, subject to the following conditions:
+#
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON-INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#   IN THE SOFTWARE.
+# #
+
+from __future__ import annotations
+
+import gzip
+
+from shutil import copyfileobj
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# -----------------------------------------------------------------------------
+# Functions
+# -----------------------------------------------------------------------------
+
+# Compress the given files, writing precompressed siblings in the given formats
+# next to each file, i.e., `.gz` for gzip and `.br` for brotli, so static file
+# servers can serve them without compressing them on every request
+def compress(paths: list[str], formats: list[str]):
+    for path in paths:
+        if "gzip" in formats:
+            _compress_gzip(path)
+        if "brotli" in formats:
+            _compress_brotli(path)
+
+# -----------------------------------------------------------------------------
+
+# Compress file with gzip - the modification time is omitted from the header,
+# so the compressed file only changes if the original file changes
+def _compress_gzip(path: str):
+    with open(path, "rb") as src, open(f"{path}.gz", "wb") as dest:
+        with gzip.GzipFile(
+            filename = "", mode = "wb", fileobj = dest, mtime = 0
+        ) as f:
+            copyfileobj(src, f)
+
+# Compress file with brotli in chunks, so the file is never held in memory
+def _compress_brotli(path: str):
+    compressor = brotli.Compressor(mode = brotli.MODE_TEXT)
+    with open(path, "rb") as src, open(f"{path}.br", "wb") as dest:
+        for chunk in iter(lambda: src.read(1 << 16), b""):
+            dest.write(compressor.process(chunk))
+
+        # Flush remaining data
+        dest.write(compressor.finish())
@@ -37,6 +37,15 @@ from mkdocs.contrib.search import LangOption
 # Options for search pipeline
 pipeline = ("stemmer", "stopWordFilter", "trimmer")
 
+# Options for parser
+parsers = ("default", "fast")
+
+# Options for compression
+formats = ("gzip", "brotli")
+
+# Options for texts exceeding budgets
+policies = ("truncate", "drop")
+
 # -----------------------------------------------------------------------------
 # Classes
 # -----------------------------------------------------------------------------
@@ -44,17 +53,54 @@ pipeline = ("stemmer", "stopWordFilter", "trimmer")
 # Search plugin configuration
 class SearchConfig(Config):
     enabled = Type(bool, default = True)
+    concurrency = Type(int, default = 1)
 
     # Settings for search
     lang = Optional(LangOption())
     separator = Optional(Type(str))
     pipeline = Optional(ListOfItems(Choice(pipeline)))
+    parser = Choice(parsers, default = "default")
+
+    # Settings for search index format - the compact format is written to a
+    # separate file, as the search worker only reads the default format
+    compact = Type(bool, default = False)
+    plain = Type(bool, default = False)
+
+    # Settings for deduplication and budgets (in bytes, 0 means no budget)
+    deduplicate = Type(bool, default = False)
+    budget_page = Type(int, default = 0)
+    budget_section = Type(int, default = 0)
+    budget_policy = Choice(policies, default = "truncate")
+
+    # Settings for sharding
+    shards = Type(bool, default = False)
+    shards_by = Choice(("section", "size"), default = "section")
+    shards_size = Type(int, default = 1000000)
+
+    # Settings for deltas against search index of previous build
+    delta = Type(bool, default = False)
+
+    # Settings for partial search index, which can be merged with others
+    partial = Type(bool, default = False)
+
+    # Settings for compression
+    compress = ListOfItems(Choice(formats), default = [])
+
+    # Settings for build report
+    report = Type(bool, default = False)
+
+    # Settings for caching
+    cache = Type(bool, default = True)
+    cache_dir = Type(str, default = ".cache/plugin/search")
 
     # Settings for text segmentation (Chinese)
     jieba_dict = Optional(Type(str))
     jieba_dict_user = Optional(Type(str))
 
+    # Settings for prebuilding the search index, which is written to a separate
+    # file - the search worker builds its own index and doesn't load it
+    prebuild_index = Type(bool, default = False)
+
     # Unsupported settings, originally implemented in MkDocs
     indexing = Deprecated(message = "Unsupported option")
-    prebuild_index = Deprecated(message = "Unsupported option")
     min_search_length = Deprecated(message = "Unsupported option")
@@ -0,0 +1,154 @@
+# #
+#   Copyright (c) 2025 Aetherinox
+#
+#   Permission is hereby granted, free of charge, to any person obtaining a copy
+#   of this software and associated documentation files (the "Software"), to
+#   deal in the Software without restriction, including without limitation the
+#   rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#   sell copies of the Software, and to permit persons to whom the Software is
+#   furnished to do so, subject to the following conditions:
+#
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON-INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#   IN THE SOFTWARE.
+# #
+
+
+import argparse
+import json
+import logging
+
+from .compress import brotli, compress
+from .config import SearchConfig, formats
+from .plugin import SearchIndex, _write_search_index
+
+# -----------------------------------------------------------------------------
+# Functions
+# -----------------------------------------------------------------------------
+
+# Merge partial search indexes of several builds into a single search index,
+# or a sharded one, rewriting locations with the given prefixes, which allows
+# to build projects or parts of a site in parallel - run with:
+#
+#   python -m material.plugins.search.merge --output site/search \
+#     a/search/search_index.partial.json=a/ \
+#     b/search/search_index.partial.json=b/
+#
+# Partial search indexes are written by the search plugin if "partial" is
+# enabled, and must share the same language, separator and pipeline.
+def main(argv = None):
+    parser = argparse.ArgumentParser(
+        prog = "python -m material.plugins.search.merge",
+        description = "Merge partial search indexes into a search index."
+    )
+    parser.add_argument("partials", nargs = "+", metavar = "PARTIAL[=PREFIX]")
+    parser.add_argument("--output", required = True)
+    parser.add_argument("--compact", action = "store_true")
+    parser.add_argument("--shards", action = "store_true")
+    parser.add_argument("--shards-by", choices = ["section", "size"], default = "section")
+    parser.add_argument("--shards-size", type = int, default = 1000000)
+    parser.add_argument("--compress", choices = formats, action = "append", default = [])
+    args = parser.parse_args(argv)
+
+    # Check dependencies for compressing the search index
+    if "brotli" in args.compress and not brotli:
+        parser.error("brotli not found. Install with: pip install brotli")
+
+    # Load partial search indexes
+    index, config = None, None
+    for value in args.partials:
+        path, _, prefix = value.partition("=")
+        try:
+            with open(path, encoding = "utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            parser.error(f"Couldn't load '{path}': {e}")
+
+        # Ensure file is a partial search index
+        if not isinstance(data, dict) or data.get("format") != "partial":
+            parser.error(f"'{path}' is not a partial search index")
+
+        # Create search index from configuration of first partial search index
+        if index is None:
+            config = data["config"]
+            search = SearchConfig()
+            search.load_dict({
+                **data["config"],
+                "compact": args.compact,
+                "shards": args.shards,
+                "shards_by": args.shards_by,
+                "shards_size": args.shards_size,
+                "cache": False
+            })
+            errors, _ = search.validate()
+            for key, error in errors:
+                parser.error(f"{key}: {error}")
+
+            # Initialize search index
+            index = SearchIndex(**search)
+
+        # Ensure configuration matches, as search indexes with different
+        # languages, separators or pipelines can't be merged
+        elif data["config"] != config:
+            parser.error(
+                f"'{path}' doesn't share language, separator and pipeline "
+                f"with '{args.partials[0].partition('=')[0]}'"
+            )
+
+        # Add pages of partial search index
+        merge(index, data, prefix)
+
+    # Write search index, and shards, if enabled
+    paths = _write_search_index(index, args.output)
+
+    # Compress files, if enabled
+    if args.compress:
+        compress(paths, args.compress)
+
+    # Report written files
+    for path in paths:
+        log.info(f"Written: {path}")
+
+# Add pages of partial search index to search index, prefixing locations with
+# the given prefix, as locations are relative to the site directory of each
+# build - pages that already exist are replaced, so the last one wins
+def merge(index, data, prefix = ""):
+    if prefix:
+        prefix = prefix.strip("/") + "/"
+
+    # Add pages with entries and top-level section
+    for page in data["pages"]:
+        url = prefix + page["location"]
+        if url in index.pages:
+            log.warning(f"Duplicate page '{url}', replacing previous one")
+
+        # Rewrite locations of entries
+        index.pages[url] = [
+            { **entry, "location": prefix + entry["location"] }
+                for entry in page["docs"]
+        ]
+
+        # Set top-level section, if any
+        if page["section"]:
+            index.sections[url] = page["section"]
+
+# -----------------------------------------------------------------------------
+# Data
+# -----------------------------------------------------------------------------
+
+# Set up logging
+log = logging.getLogger("mkdocs.material.search")
+
+# -----------------------------------------------------------------------------
+
+# Merge partial search indexes
+if __name__ == "__main__":
+    logging.basicConfig(format = "%(levelname)-7s -  %(message)s", level = logging.INFO)
+    main()
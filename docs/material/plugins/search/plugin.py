@@ -20,22 +20,38 @@
 #   IN THE SOFTWARE.
 # #
 
+import functools
+import itertools
 import json
 import logging
 import os
+import posixpath
+import time
 import regex as re
 
+from collections import defaultdict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from hashlib import sha1
 from html import escape
 from html.parser import HTMLParser
-from mkdocs import utils
+from importlib.util import find_spec
+from mkdocs.exceptions import PluginError
 from mkdocs.plugins import BasePlugin
+from types import SimpleNamespace
 
+from ... import __version__
+from .compress import brotli, compress
 from .config import SearchConfig
 
+# Segmentation of Chinese text requires jieba, but importing it is deferred until
+# the first run of Han characters is found, as loading it is expensive
+jieba = find_spec("jieba") is not None
+
 try:
-    import jieba
+    import lunr
+    from lunr.pipeline import Pipeline
 except ImportError:
-    jieba = None
+    lunr = None
 
 # -----------------------------------------------------------------------------
 # Classes
@@ -52,9 +68,14 @@ class SearchPlugin(BasePlugin[SearchConfig]):
         self.is_dirty = False
         self.is_dirtyreload = False
 
-        # Initialize search index cache
+        # Initialize search index and search index cache
+        self.search_index = None
         self.search_index_prev = None
 
+        # Initialize thread pool for compression
+        self.pool = ThreadPoolExecutor(1)
+        self.pool_jobs = []
+
     # Determine whether we're serving the site
     def on_startup(self, *, command, dirty):
         self.is_dirty = dirty
@@ -82,28 +103,53 @@ class SearchPlugin(BasePlugin[SearchConfig]):
                 r"\s*,\s*", self._translate(config, "search.config.pipeline")
             )))
 
-        # Initialize search index
+        # Check dependencies for prebuilding the search index
+        if self.config.prebuild_index and not lunr:
+            raise PluginError(
+                "Required dependencies for \"search.prebuild_index\" not "
+                "found. Install with: pip install \"lunr[languages]\""
+            )
+
+        # Check dependencies for prebuilding the search index for languages
+        # other than English, which require NLTK - without it, lunr silently
+        # builds the search index with the English stemmer and stop words
+        if self.config.prebuild_index and not lunr.languages.LANGUAGE_SUPPORT:
+            languages = [lang for lang in self.config.lang if lang != "en"]
+            if languages:
+                raise PluginError(
+                    f"Required dependencies for \"search.prebuild_index\" "
+                    f"with languages {', '.join(languages)} not found. "
+                    f"Install with: pip install \"lunr[languages]\""
+                )
+
+        # Check dependencies for compressing the search index
+        if "brotli" in self.config.compress and not brotli:
+            raise PluginError(
+                "Required dependencies for \"search.compress\" not found. "
+                "Install with: pip install brotli"
+            )
+
+        # Initialize search index, shutting down the process pool of the search
+        # index of the previous build, if any, which is left running when the
+        # previous build failed before the search index was generated
+        if self.search_index:
+            self.search_index.shutdown()
         self.search_index = SearchIndex(**self.config)
 
-        # Set jieba dictionary, if given
+        # Check jieba dictionary, if given - dictionaries are loaded when the
+        # first run of Han characters is found, which might never happen
         if self.config.jieba_dict:
             path = os.path.normpath(self.config.jieba_dict)
-            if os.path.isfile(path):
-                jieba.set_dictionary(path)
-                log.debug(f"Loading jieba dictionary: {path}")
-            else:
+            if not os.path.isfile(path):
                 log.warning(
                     f"Configuration error for 'search.jieba_dict': "
                     f"'{self.config.jieba_dict}' does not exist."
                 )
 
-        # Set jieba user dictionary, if given
+        # Check jieba user dictionary, if given
         if self.config.jieba_dict_user:
             path = os.path.normpath(self.config.jieba_dict_user)
-            if os.path.isfile(path):
-                jieba.load_userdict(path)
-                log.debug(f"Loading jieba user dictionary: {path}")
-            else:
+            if not os.path.isfile(path):
                 log.warning(
                     f"Configuration error for 'search.jieba_dict_user': "
                     f"'{self.config.jieba_dict_user}' does not exist."
@@ -116,24 +162,63 @@ class SearchPlugin(BasePlugin[SearchConfig]):
 
         # Index page
         self.search_index.add_entry_from_context(page)
-        page.content = re.sub(
-            r"\s?data-search-\w+=\"[^\"]+\"",
-            "",
-            page.content
-        )
+
+        # Remove search attributes - most pages don't contain any, so we check
+        # for them with a substring search first, which is considerably faster
+        # than a substitution, as the latter always copies the entire page
+        if "data-search-" in page.content:
+            page.content = attributes.sub("", page.content)
 
     # Generate search index
     def on_post_build(self, *, config):
         if not self.config.enabled:
             return
 
-        # Write search index
+        # Reconcile compression jobs of previous build, if any, before files
+        # are overwritten, which might happen under dirty reload
+        self._reconcile()
+
+        # Generate and write search index, and shards, if enabled
         base = os.path.join(config.site_dir, "search")
-        path = os.path.join(base, "search_index.json")
+        start = time.perf_counter()
+        paths = _write_search_index(
+            self.search_index, base, self.search_index_prev
+        )
 
-        # Generate and write search index to file
-        data = self.search_index.generate_search_index(self.search_index_prev)
-        utils.write_file(data.encode("utf-8"), path)
+        # Write build report, if enabled, which includes the time it took to
+        # generate and write the search index, and the size of the search index
+        if self.config.report:
+            report = self.search_index.generate_report(
+                time.perf_counter() - start, os.path.getsize(paths[0])
+            )
+            _write_to_file(os.path.join(base, "report.json"), [
+                json.dumps(report, separators = (",", ":"))
+            ])
+
+        # Write partial search index, if enabled, which is not compressed, as
+        # it's not served, but merged with other partial search indexes
+        if self.config.partial:
+            _write_to_file(
+                os.path.join(base, "search_index.partial.json"),
+                self.search_index.generate_search_index_partial()
+            )
+
+        # Remove cached entries that were not used - under dirty builds, only
+        # changed pages are indexed, so the cache is only pruned when entries
+        # were merged with the search index of the previous build. The cache
+        # might be shared by several projects, which are told apart by their
+        # configuration file and site directory.
+        if not self.is_dirty or self.search_index_prev:
+            self.search_index.prune_cache(json.dumps([
+                config.config_file_path, config.site_dir
+            ]))
+
+        # Compress files in a separate thread while the build finishes, if
+        # enabled - jobs are reconciled on shutdown or before the next build
+        if self.config.compress:
+            self.pool_jobs.append(self.pool.submit(
+                compress, paths, self.config.compress
+            ))
 
         # Persist search index for repeated invocation
         if self.is_dirty:
@@ -143,8 +228,23 @@ class SearchPlugin(BasePlugin[SearchConfig]):
     def on_serve(self, server, *, config, builder):
         self.is_dirtyreload = self.is_dirty
 
+    # Reconcile compression jobs and shut down thread and process pool
+    def on_shutdown(self):
+        self._reconcile()
+        self.pool.shutdown()
+        if self.search_index:
+            self.search_index.shutdown()
+
     # -------------------------------------------------------------------------
 
+    # Reconcile compression jobs, raising errors, if any
+    def _reconcile(self):
+        for job in self.pool_jobs:
+            job.result()
+
+        # Clear jobs
+        self.pool_jobs.clear()
+
     # Translate the given placeholder value
     def _translate(self, config, value):
         env = config.theme.get_env()
@@ -162,27 +262,86 @@ class SearchIndex:
     # Initialize search index
     def __init__(self, **config):
         self.config = config
-        self.entries = []
+
+        # Initialize entries and encoded entries, grouped by page location, so
+        # the entries of a single page can be replaced under dirty reload
+        self.pages = {}
+        self.pages_encoded = {}
+
+        # Initialize top-level sections of pages, used for sharding
+        self.sections = {}
+
+        # Initialize digests of section texts, used for deduplication, and
+        # number of sections and bytes cut from texts, used for reporting
+        self.texts = {}
+        self.cuts = {}
+
+        # Initialize statistics of pages, used for the build report
+        self.stats = {}
+
+        # Initialize digests of pages by location, used for pruning the cache
+        self.digests = {}
+
+        # Initialize version and encoded entries by location, used for deltas
+        self.version = None
+        self.snapshot = None
+
+        # Initialize process pool, which is created on the first page that
+        # needs to be indexed, if concurrency is enabled
+        self.pool = None
+        self.pool_jobs = []
 
     # Add page to search index
     def add_entry_from_context(self, page):
         search = page.meta.get("search") or {}
         if search.get("exclude"):
+            self.pages[page.url] = []
+            self.digests[page.url] = None
             return
 
-        # Divide page content into sections
-        parser = Parser()
-        parser.feed(page.content)
-        parser.close()
+        # Remember top-level section of page, if sharding by section or
+        # exporting a partial search index, which might be sharded later on
+        if self.config.get("shards") or self.config.get("partial"):
+            ancestors = getattr(page, "ancestors", None)
+            if ancestors:
+                self.sections[page.url] = ancestors[-1].title
+
+        # Compute digest of page and reuse cached entries, if available
+        digest = self._digest(page)
+        result = self._load_from_cache(digest)
+        self.digests[page.url] = digest
+
+        # Index page in a separate process, if concurrency is enabled. Jobs are
+        # reconciled when generating the index, and the page is added with no
+        # entries for now, so the order of pages is stable, regardless of which
+        # job ends first.
+        if self.config.get("concurrency", 1) > 1:
+            if result is None:
+                if not self.pool:
+                    self.pool = ProcessPoolExecutor(self.config["concurrency"])
+
+                # Submit job to process pool
+                job = self.pool.submit(_index_page, self.config, _snapshot(page))
+            else:
+                job, digest = Future(), None
+                job.set_result(result)
+
+            # Append job to list of jobs
+            self.pool_jobs.append((page.url, digest, job))
+            self.pages[page.url] = []
+
+        # Otherwise index page, if not cached, and persist entries in cache
+        else:
+            if result is None:
+                result = self._index(page)
+                self._save_to_cache(digest, result)
 
-        # Add sections to index
-        for section in parser.data:
-            if not section.is_excluded():
-                self.create_entry_for_section(section, page.toc, page.url, page)
+            # Add entries of page to index
+            self._add(page.url, *result)
 
     # Override: graceful indexing and additional fields
     def create_entry_for_section(self, section, toc, url, page):
-        item = self._find_toc_by_id(toc, section.id)
+        item = toc.get(section.id)
         if item:
             url = url + item.url
         elif section.id:
@@ -204,6 +363,13 @@ class SearchIndex:
             title = self._segment_chinese(title)
             text  = self._segment_chinese(text)
 
+        # Convert title and text to plain text, if enabled, retaining code
+        # spans as offsets, so clients don't need to strip markup
+        code, title_code = None, None
+        if self.config.get("plain"):
+            title, title_code = _plain(title)
+            text, code = _plain(text)
+
         # Create entry for section
         entry = {
             "location": url,
@@ -211,6 +377,12 @@ class SearchIndex:
             "text": text
         }
 
+        # Set code spans of title and text, if any
+        if title_code:
+            entry["title_code"] = title_code
+        if code:
+            entry["code"] = code
+
         # Set document tags
         tags = page.meta.get("tags")
         if isinstance(tags, list):
@@ -224,70 +396,736 @@ class SearchIndex:
         if "boost" in search:
             entry["boost"] = search["boost"]
 
-        # Add entry to index
-        self.entries.append(entry)
+        # Return entry
+        return entry
 
-    # Generate search index
+    # Cancel pending jobs and shut down process pool, if any - this must be
+    # called when the search index is discarded, e.g., because the build failed
+    # before the search index was generated, so no worker processes are leaked
+    def shutdown(self):
+        for _, _, job in self.pool_jobs:
+            job.cancel()
+
+        # Clear jobs and shut down process pool
+        self.pool_jobs.clear()
+        if self.pool:
+            self.pool.shutdown()
+            self.pool = None
+
+    # Generate search index, which yields chunks of JSON to write to a file
     def generate_search_index(self, prev):
         config = {
             key: self.config[key]
                 for key in ["lang", "separator", "pipeline"]
         }
 
+        # Reconcile jobs and persist entries of indexed pages in cache
+        for url, digest, job in self.pool_jobs:
+            result = job.result()
+            if digest:
+                self._save_to_cache(digest, result)
+
+            # Add entries of page to index
+            self._add(url, *result)
+
+        # Clear jobs and shut down process pool
+        self.shutdown()
+
+        # Report sections that were deduplicated, truncated or dropped
+        if self.cuts:
+            log.info("Search index: " + ", ".join(
+                f"{kind} {sections} sections ({size / 1000:.1f} kB)"
+                    for kind, (sections, size) in self.cuts.items()
+            ))
+
         # Hack: if we're running under dirty reload, the search index will only
-        # include the entries for the current page. However, MkDocs > 1.4 allows
-        # us to persist plugin state across rebuilds, which is exactly what we
-        # do by passing the previously built index to this method. Thus, we just
-        # remove the previous entries for the current page, and append the new
-        # entries to the end of the index, as order doesn't matter.
-        if prev and self.entries:
-            path = self.entries[0]["location"]
-
-            # Since we're sure that we're running under dirty reload, the list
-            # of entries will only contain sections for a single page. Thus, we
-            # use the first entry to remove all entries from the previous run
-            # that belong to the current page. The rationale behind this is that
-            # authors might add or remove section headers, so we need to make
-            # sure that sections are synchronized correctly.
-            entries = [
-                entry for entry in prev.entries
-                    if not entry["location"].startswith(path)
-            ]
+        # include the entries for the pages that were rebuilt. However, MkDocs
+        # > 1.4 allows us to persist plugin state across rebuilds, which is
+        # exactly what we do by passing the previously built index to this
+        # method. Since entries are grouped by page location, we replace the
+        # entries of each rebuilt page in the previous index, which takes
+        # constant time per page and retains the order of pages. The rationale
+        # behind this is that authors might add or remove section headers, so
+        # we need to make sure that sections are synchronized correctly.
+        if prev:
+            for url in self.pages:
+                prev.pages_encoded.pop(url, None)
+
+            # Merge previous with current entries, sections, statistics and
+            # digests of pages
+            prev.pages.update(self.pages)
+            prev.sections.update(self.sections)
+            prev.stats.update(self.stats)
+            prev.digests.update(self.digests)
+            self.pages = prev.pages
+            self.pages_encoded = prev.pages_encoded
+            self.sections = prev.sections
+            self.stats = prev.stats
+            self.digests = prev.digests
+
+        # Compute version of search index from configuration and entries, if
+        # deltas are enabled, and retain encoded entries for the delta
+        if self.config.get("delta"):
+            encoder = json.JSONEncoder(separators = (",", ":"), default = str)
+            digest = sha1(encoder.encode(config).encode("utf-8"))
+            self.snapshot = {}
+            for entry in self._entries():
+                data = encoder.encode(entry)
+                digest.update(data.encode("utf-8"))
+                self.snapshot[entry["location"]] = data
+
+            # Set version
+            self.version = digest.hexdigest()
+
+        # Yield search index as JSON - under dirty reload, we retain the encoded
+        # entries of each page, so only the entries of rebuilt pages are encoded
+        if prev:
+            docs = map(self._encode_page, self.pages)
+            yield from self._encode(config, docs)
+
+        # Otherwise encode entry by entry
+        else:
+            encoder = json.JSONEncoder(separators = (",", ":"), default = str)
+            docs = map(encoder.encode, self._entries())
+            yield from self._encode(config, docs)
+
+    # Generate search index in compact format, which yields chunks of JSON -
+    # this must be called after the search index was generated, as entries are
+    # only complete after reconciliation. The compact format is written to a
+    # separate file, as the search worker only reads the default format.
+    def generate_search_index_compact(self):
+        config = {
+            key: self.config[key]
+                for key in ["lang", "separator", "pipeline"]
+        }
 
-            # Merge previous with current entries
-            self.entries = entries + self.entries
+        # Yield search index as JSON in compact format
+        yield from self._encode_compact(config)
 
-        # Otherwise just set previous entries
-        if prev and not self.entries:
-            self.entries = prev.entries
+    # Generate prebuilt search index, which yields chunks of JSON - this must be
+    # called after the search index was generated, as entries are only complete
+    # after reconciliation. The prebuilt index is written to a separate file,
+    # which clients can opt into, as the search worker builds its own index.
+    def generate_search_index_lunr(self):
+        config = {
+            key: self.config[key]
+                for key in ["lang", "separator", "pipeline"]
+        }
 
-        # Return search index as JSON
-        data = { "config": config, "docs": self.entries }
-        return json.dumps(
-            data,
-            separators = (",", ":"),
-            default = str
-        )
+        # Yield configuration and prebuilt index
+        encoder = json.JSONEncoder(separators = (",", ":"), default = str)
+        yield "".join([
+            "{\"config\":", encoder.encode(config), self._encode_version(),
+            ",\"index\":", encoder.encode(self._prebuild(self._entries())), "}"
+        ])
+
+    # Generate search index shards, which yields the top-level sections and
+    # chunks of JSON for each shard - this must be called after the search
+    # index was generated, as entries are only complete after reconciliation
+    def generate_search_index_shards(self):
+        config = {
+            key: self.config[key]
+                for key in ["lang", "separator", "pipeline"]
+        }
+
+        # Divide entries into shards by top-level section, retaining the order
+        # in which sections and entries appear in the search index
+        encoder = json.JSONEncoder(separators = (",", ":"), default = str)
+        if self.config["shards_by"] == "section":
+            shards = {}
+            for url, entries in self.pages.items():
+                section = self.sections.get(url)
+                shards.setdefault(section, []).extend(entries)
+
+            # Yield shards
+            for section, entries in shards.items():
+                yield [section] if section else [], \
+                    self._encode(config, map(encoder.encode, entries))
+
+        # Divide entries into shards by size, so that each shard stays within
+        # the given budget, unless a single entry exceeds it
+        else:
+            docs, sections, size = [], {}, 0
+            for url, entries in self.pages.items():
+                for entry in entries:
+                    data = encoder.encode(entry)
+                    length = len(data.encode("utf-8"))
+                    if docs and size + length > self.config["shards_size"]:
+                        yield [section for section in sections if section], \
+                            self._encode(config, docs)
+
+                        # Start next shard
+                        docs, sections, size = [], {}, 0
+
+                    # Add entry to shard
+                    docs.append(data)
+                    sections[self.sections.get(url)] = None
+                    size += length + 1
+
+            # Yield last shard
+            if docs:
+                yield [section for section in sections if section], \
+                    self._encode(config, docs)
+
+    # Generate partial search index, which yields chunks of JSON - entries are
+    # grouped by page together with the top-level section, so partial search
+    # indexes of several builds can be merged into a single or sharded index
+    def generate_search_index_partial(self):
+        config = {
+            key: self.config[key]
+                for key in ["lang", "separator", "pipeline"]
+        }
+
+        # Yield configuration
+        encoder = json.JSONEncoder(separators = (",", ":"), default = str)
+        yield "".join([
+            "{\"config\":", encoder.encode(config), ",\"format\":\"partial\",",
+            "\"pages\":["
+        ])
+
+        # Yield pages with entries, reusing encoded entries, if available
+        for position, url in enumerate(self.pages):
+            yield "".join([
+                "," if position else "",
+                "{\"location\":", encoder.encode(url),
+                ",\"section\":", encoder.encode(self.sections.get(url)),
+                ",\"docs\":[", self._encode_page(url), "]}"
+            ])
+
+        # Close partial search index
+        yield "]}"
+
+    # Generate build report with statistics for each indexed page, i.e., the
+    # time it took to parse the page, which is zero for cached pages, and the
+    # number of indexed and excluded sections and bytes of entries, as well as
+    # totals, including the time it took to generate and write the search
+    # index and its size, which must be passed, as they're measured outside
+    def generate_report(self, serialization, size):
+        encoder = json.JSONEncoder(separators = (",", ":"), default = str)
+
+        # Collect statistics of pages in order of pages
+        pages = []
+        for url, (cached, elapsed, excluded) in self.stats.items():
+            entries = self.pages.get(url, [])
+            pages.append({
+                "location": url,
+                "cached": cached,
+                "time": round(elapsed, 6),
+                "sections": len(entries),
+                "excluded": excluded,
+                "bytes": sum(
+                    len(encoder.encode(entry).encode("utf-8"))
+                        for entry in entries
+                )
+            })
+
+        # Return report with pages and totals
+        return {
+            "pages": pages,
+            "totals": {
+                "pages": len(pages),
+                "cached": sum(page["cached"] for page in pages),
+                "time": round(sum(page["time"] for page in pages), 6),
+                "sections": sum(page["sections"] for page in pages),
+                "excluded": sum(page["excluded"] for page in pages),
+                "bytes": sum(page["bytes"] for page in pages),
+                "serialization": round(serialization, 6),
+                "size": size
+            }
+        }
+
+    # Generate delta between the search index of the previous and this build,
+    # which returns the version of the previous build and chunks of JSON, so a
+    # client that cached the previous search index can patch it. Entries are
+    # keyed by location, and the delta contains added and changed entries, as
+    # well as locations of removed entries. This must be called after the search
+    # index was generated. Entries of this build are persisted in the cache
+    # directory, and nothing is returned on the first build or if unchanged.
+    def generate_search_index_delta(self):
+        config = {
+            key: self.config[key]
+                for key in ["lang", "separator", "pipeline"]
+        }
+
+        # Load entries of previous build, and persist entries of this build
+        prev = self._load_snapshot()
+        self._save_snapshot()
+        if not prev or prev["version"] == self.version:
+            return None
+
+        # Encode entries of previous build for comparison
+        encoder = json.JSONEncoder(separators = (",", ":"), default = str)
+        entries = {
+            location: encoder.encode(entry)
+                for location, entry in prev["entries"].items()
+        }
+
+        # Encode list of the given values
+        def column(name, values):
+            yield f",\"{name}\":["
+            for position, value in enumerate(values):
+                yield "," + value if position else value
+
+            # Close list
+            yield "]"
+
+        # Generate delta, yielding entry by entry
+        def generate():
+            yield "".join([
+                "{\"config\":", encoder.encode(config),
+                ",\"from\":", encoder.encode(prev["version"]),
+                ",\"version\":", encoder.encode(self.version)
+            ])
+            yield from column("added", (
+                data for location, data in self.snapshot.items()
+                    if location not in entries
+            ))
+            yield from column("changed", (
+                data for location, data in self.snapshot.items()
+                    if location in entries and entries[location] != data
+            ))
+            yield from column("removed", (
+                encoder.encode(location) for location in entries
+                    if location not in self.snapshot
+            ))
+            yield "}"
+
+        # Return version of previous build and delta
+        return prev["version"], generate()
 
     # -------------------------------------------------------------------------
 
-    # Retrieve item for anchor
-    def _find_toc_by_id(self, toc, id):
-        for toc_item in toc:
-            if toc_item.id == id:
-                return toc_item
+    # Retrieve all entries in order of pages
+    def _entries(self):
+        for entries in self.pages.values():
+            yield from entries
+
+    # Encode configuration and the given encoded entries as JSON, yielding
+    # entry by entry, so the index is never held in memory in its entirety
+    def _encode(self, config, docs):
+        encoder = json.JSONEncoder(separators = (",", ":"), default = str)
+        yield "".join([
+            "{\"config\":", encoder.encode(config), self._encode_version(),
+            ",\"docs\":["
+        ])
+        for position, data in enumerate(filter(None, docs)):
+            yield "," + data if position else data
+
+        # Close search index
+        yield "]}"
+
+    # Encode configuration and entries as JSON in compact format - pages are
+    # stored once in a page table with their location, tags and boost, and
+    # sections refer to pages by position and only store the anchor suffix of
+    # their location. Tags are interned in a string table, and both tables
+    # are stored column by column, yielding value by value.
+    def _encode_compact(self, config):
+        encoder = json.JSONEncoder(separators = (",", ":"), default = str)
+        pages = [
+            (url, entries) for url, entries in self.pages.items() if entries
+        ]
+
+        # Intern tags of all pages - tags are the same for all entries of a
+        # page, so we use the first entry. Tags are keyed by type and value,
+        # as booleans would otherwise collide with integers.
+        tags = {}
+        for _, entries in pages:
+            for tag in entries[0].get("tags", []):
+                tags.setdefault((type(tag), tag), len(tags))
+
+        # Encode column with the given name and values
+        def column(name, values):
+            yield f"\"{name}\":["
+            for position, value in enumerate(values):
+                yield "," + encoder.encode(value) if position else encoder.encode(value)
+
+            # Close column
+            yield "]"
+
+        # Yield configuration and string table
+        yield "".join([
+            "{\"config\":", encoder.encode(config), self._encode_version(),
+            ",\"format\":\"compact\",",
+            "\"tags\":", encoder.encode([tag for _, tag in tags]), ","
+        ])
 
-            # Recurse into children of item
-            toc_item = self._find_toc_by_id(toc_item.children, id)
-            if toc_item is not None:
-                return toc_item
+        # Yield page table
+        yield "\"pages\":{"
+        yield from column("location", (url for url, _ in pages))
+        yield ","
+        yield from column("tags", (
+            [tags[(type(tag), tag)] for tag in entries[0].get("tags", [])]
+                for _, entries in pages
+        ))
+        yield ","
+        yield from column("boost", (
+            entries[0].get("boost") for _, entries in pages
+        ))
+
+        # Yield sections
+        yield "},\"docs\":{"
+        yield from column("page", (
+            position
+                for position, (_, entries) in enumerate(pages)
+                for _ in entries
+        ))
+        yield ","
+        yield from column("location", (
+            entry["location"][len(url):]
+                for url, entries in pages for entry in entries
+        ))
+        for key in ["title", "text"]:
+            yield ","
+            yield from column(key, (
+                entry[key] for _, entries in pages for entry in entries
+            ))
+
+        # Yield code spans of titles and texts, if plain text is enabled
+        if self.config.get("plain"):
+            for key in ["title_code", "code"]:
+                yield ","
+                yield from column(key, (
+                    entry.get(key, []) for _, entries in pages for entry in entries
+                ))
+
+        # Close search index
+        yield "}}"
+
+    # Encode version of search index, if deltas are enabled, which is used by
+    # clients to request the delta to patch a cached search index with
+    def _encode_version(self):
+        if not self.version:
+            return ""
+        else:
+            return ",\"version\":\"" + self.version + "\""
+
+    # Encode entries of the page with the given location, and retain them
+    def _encode_page(self, url):
+        if url not in self.pages_encoded:
+            encoder = json.JSONEncoder(separators = (",", ":"), default = str)
+            self.pages_encoded[url] = ",".join(
+                map(encoder.encode, self.pages[url])
+            )
+
+        # Return encoded entries
+        return self.pages_encoded[url]
+
+    # Prebuild search index with the configured separator and pipeline, so a
+    # client can load the index instead of building it on page load. The fields
+    # and boosts match the ones used by the search worker, which doesn't load
+    # prebuilt indexes, so only custom clients benefit from it.
+    def _prebuild(self, entries):
+        separator = re.compile(self.config["separator"])
+        pipeline = self.config["pipeline"]
+
+        # Tokenize value with the configured separator, removing markup
+        def tokenize(value):
+            value = re.sub(r"<[^>]+>", " ", value)
+            return [token for token in separator.split(value) if token]
+
+        # Create builder with stemmers and stop word filters for languages,
+        # which are only available for languages other than English if NLTK
+        # is installed - unsupported languages fall back to English
+        languages = [
+            language for language in self.config["lang"]
+                if language == "en" or (
+                    lunr.languages.LANGUAGE_SUPPORT and
+                    language in lunr.languages.SUPPORTED_LANGUAGES
+                )
+        ]
+        if set(languages) != set(self.config["lang"]):
+            log.warning(
+                f"Prebuilding the search index is not supported for all "
+                f"languages in 'search.lang': {', '.join(self.config['lang'])}"
+            )
 
-        # No item found
+        # Retain only those functions in pipelines that are configured, but
+        # retain the order in which the builder defines them
+        builder = lunr.get_default_builder(languages or None)
+        for target in [builder.pipeline, builder.search_pipeline]:
+            labels = target.serialize()
+            target.reset()
+            for label in labels:
+                if any(step.lower() in label.lower() for step in pipeline):
+                    target.add(Pipeline.registered_functions[label])
+
+        # Set up fields, which must match the client
+        builder.ref("location")
+        builder.field("title", boost = 1e3, extractor = lambda doc: (
+            tokenize(doc["title"])
+        ))
+        builder.field("text", extractor = lambda doc: (
+            tokenize(doc["text"])
+        ))
+        builder.field("tags", boost = 1e6, extractor = lambda doc: [
+            token for tag in doc.get("tags", []) for token in tokenize(str(tag))
+        ])
+
+        # Add entries and return serialized index
+        for entry in entries:
+            builder.add(entry, { "boost": entry.get("boost", 1) })
+        return builder.build().serialize()
+
+    # Index page, and return entries, number of excluded sections and the time
+    # it took to parse the page and create entries
+    def _index(self, page):
+        start = time.perf_counter()
+        entries, excluded = self._create_entries(page)
+        return entries, excluded, time.perf_counter() - start
+
+    # Add entries of page to index, and record statistics, if enabled - if the
+    # entries were cached, the time is not set, as the page wasn't parsed
+    def _add(self, url, entries, excluded, elapsed = None):
+        self.pages[url] = self._prune(entries)
+        if self.config.get("report"):
+            self.stats[url] = elapsed is None, elapsed or 0, excluded
+
+    # Deduplicate section texts and enforce budgets, if enabled - the texts of
+    # sections that are identical to the text of a previous section are removed,
+    # and texts exceeding the section or the remaining page budget are either
+    # truncated or removed, depending on the policy. Titles are always retained,
+    # so sections can still be found. As this happens after entries are cached,
+    # it doesn't affect the digests of pages.
+    def _prune(self, entries):
+        deduplicate = self.config.get("deduplicate")
+        budget_page = self.config.get("budget_page") or 0
+        budget_section = self.config.get("budget_section") or 0
+        if not deduplicate and not budget_page and not budget_section:
+            return entries
+
+        # Prune entries in order, as the page budget is spent front to back
+        size = 0
+        for entry in entries:
+            data = entry["text"].encode("utf-8")
+            if not data:
+                continue
+
+            # Remove text, if identical to the text of a previous section
+            if deduplicate:
+                digest = sha1(data).digest()
+                if digest in self.texts:
+                    self._cut(entry, "", "deduplicated", self.texts[digest])
+                    continue
+
+                # Remember location of first section with this text
+                self.texts[digest] = entry["location"]
+
+            # Compute budget of section - the page budget is shared among all
+            # sections of a page, so each section can only use what is left
+            budget = len(data)
+            if budget_section:
+                budget = min(budget, budget_section)
+            if budget_page:
+                budget = min(budget, max(budget_page - size, 0))
+
+            # Truncate or remove text, if it exceeds the budget
+            if budget < len(data):
+                if budget and self.config.get("budget_policy") == "truncate":
+                    self._cut(entry, _truncate(data, budget), "truncated")
+                else:
+                    self._cut(entry, "", "dropped")
+
+            # Update size of page
+            size += len(entry["text"].encode("utf-8"))
+
+        # Return entries
+        return entries
+
+    # Replace text of entry, and record the cut for reporting
+    def _cut(self, entry, text, kind, origin = None):
+        size = len(entry["text"].encode("utf-8")) - len(text.encode("utf-8"))
+        entry["text"] = text
+
+        # Remove code spans that were cut, and shorten code spans that were
+        # truncated, as offsets must never exceed the text
+        if "code" in entry:
+            length = _length(text)
+            entry["code"] = [
+                [start, min(end, length)]
+                    for start, end in entry["code"] if start < length
+            ]
+            if not entry["code"]:
+                del entry["code"]
+
+        # Log cut for each section
+        if origin:
+            log.debug(
+                f"Search index: {kind} '{entry['location']}' "
+                f"({size} bytes), same text as '{origin}'"
+            )
+        else:
+            log.debug(
+                f"Search index: {kind} '{entry['location']}' ({size} bytes)"
+            )
+
+        # Record cut for summary
+        sections, total = self.cuts.get(kind, (0, 0))
+        self.cuts[kind] = sections + 1, total + size
+
+    # Divide page content into sections and create entries, and return them
+    # together with the number of sections that were excluded
+    def _create_entries(self, page):
+        parser = FastParser() if self.config.get("parser") == "fast" else Parser()
+        parser.feed(page.content)
+        parser.close()
+
+        # Map anchors to items of table of contents once per page, as looking
+        # up items for each section would be quadratic on long pages
+        toc = self._map_toc_by_id(page.toc)
+
+        # Create entries for sections
+        entries = [
+            self.create_entry_for_section(section, toc, page.url, page)
+                for section in parser.data if not section.is_excluded()
+        ]
+
+        # Return entries and number of excluded sections
+        return entries, len(parser.data) - len(entries)
+
+    # Compute digest of all inputs that determine the entries of the page, i.e.,
+    # the rendered content, table of contents and relevant metadata
+    def _digest(self, page):
+        def flatten(toc):
+            for toc_item in toc:
+                yield toc_item.id, toc_item.url
+                yield from flatten(toc_item.children)
+
+        # Collect inputs, including segmentation settings, as they affect text
+        data = json.dumps([
+            __version__,
+            page.url,
+            page.title,
+            page.content,
+            list(flatten(page.toc)),
+            { key: page.meta.get(key) for key in ["title", "tags", "search"] },
+            { key: self.config.get(key) for key in ["jieba_dict", "jieba_dict_user"] },
+            bool(self.config.get("plain")),
+            bool(jieba)
+        ], default = str)
+
+        # Return digest of inputs
+        return sha1(data.encode("utf-8")).hexdigest()
+
+    # Load entries and number of excluded sections for the given digest from
+    # cache - the time is omitted, as the page doesn't need to be parsed
+    def _load_from_cache(self, digest):
+        if not self.config.get("cache"):
+            return None
+
+        # Return entries and number of excluded sections, if cached - files
+        # that can't be read are treated as a cache miss, and are overwritten
+        path = os.path.join(self.config["cache_dir"], f"{digest}.json")
+        if os.path.isfile(path):
+            try:
+                with open(path, encoding = "utf-8") as f:
+                    data = json.load(f)
+                    return data["entries"], data["excluded"]
+            except (OSError, ValueError, KeyError, TypeError):
+                log.debug(f"Ignoring invalid cached entries: {path}")
+
+        # No entries found
+        return None
+
+    # Save entries and number of excluded sections for the given digest to cache
+    def _save_to_cache(self, digest, result):
+        if not self.config.get("cache"):
+            return
+
+        # Write entries and number of excluded sections to file
+        entries, excluded, *_ = result
+        path = os.path.join(self.config["cache_dir"], f"{digest}.json")
+        _write_to_file(path, [json.dumps({
+            "entries": entries,
+            "excluded": excluded
+        }, separators = (",", ":"), default = str)])
+
+    # Remove cached entries that were used in the previous, but not in this
+    # build, i.e., entries of pages that were changed or removed since, so the
+    # cache doesn't grow with every edit. Entries are never loaded again once
+    # their page changed, as the digest of a page includes all of its inputs.
+    # The cache might be shared by several projects, e.g., one per language,
+    # so each project identified by the given name keeps a manifest of the
+    # entries it uses, and entries used by other projects are retained.
+    def prune_cache(self, name):
+        base = self.config.get("cache_dir")
+        if not self.config.get("cache") or not os.path.isdir(base):
+            return
+
+        # Load manifests of this and all other projects
+        root = os.path.join(base, "manifests")
+        path = os.path.join(root, f"{sha1(name.encode('utf-8')).hexdigest()}.json")
+        manifests = {
+            os.path.join(root, file): _load_manifest(os.path.join(root, file))
+                for file in os.listdir(root) if file.endswith(".json")
+        } if os.path.isdir(root) else {}
+
+        # Remove files of cached entries that were used in the previous build
+        # of this project, unless they're still used by any project
+        used = set(filter(None, self.digests.values()))
+        prev = set(manifests.pop(path, []))
+        for digest in prev - used.union(*manifests.values()):
+            file = os.path.join(base, f"{digest}.json")
+            if os.path.isfile(file):
+                os.remove(file)
+
+        # Persist manifest for next build
+        _write_to_file(path, [json.dumps(sorted(used))])
+
+    # Load version and entries of the search index of the previous build
+    def _load_snapshot(self):
+        path = os.path.join(self.config["cache_dir"], "index.json")
+        if os.path.isfile(path):
+            try:
+                with open(path, encoding = "utf-8") as f:
+                    data = json.load(f)
+
+                # Return search index, if valid - otherwise, no delta is written
+                if isinstance(data.get("entries"), dict) and data.get("version"):
+                    return data
+            except (OSError, ValueError, AttributeError):
+                pass
+
+            # Search index can't be read, which is treated like a first build
+            log.debug(f"Ignoring invalid search index of previous build: {path}")
+
+        # No search index found
         return None
 
+    # Save version and entries of the search index of this build, which are
+    # persisted regardless of caching, as they're needed for the next delta
+    def _save_snapshot(self):
+        path = os.path.join(self.config["cache_dir"], "index.json")
+        _write_to_file(path, itertools.chain(
+            ["{\"version\":\"", self.version, "\",\"entries\":{"],
+            (
+                ("," if position else "") + json.dumps(location) + ":" + data
+                    for position, (location, data)
+                        in enumerate(self.snapshot.items())
+            ),
+            ["}}"]
+        ))
+
+    # Map anchors to items of table of contents - if anchors are not unique,
+    # the first item in document order wins, which is what a search would find
+    def _map_toc_by_id(self, toc, data = None):
+        if data is None:
+            data = {}
+
+        # Add items and recurse into children of each item
+        for toc_item in toc:
+            data.setdefault(toc_item.id, toc_item)
+            self._map_toc_by_id(toc_item.children, data)
+
+        # Return mapping
+        return data
+
     # Find and segment Chinese characters in string
     def _segment_chinese(self, data):
-        expr = re.compile(r"(\p{IsHan}+)", re.UNICODE)
+        if not han.search(data):
+            return data.strip("\u200b")
+
+        # Retrieve dictionaries, which are loaded on first segmentation
+        dicts = [self.config.get("jieba_dict"), self.config.get("jieba_dict_user")]
 
         # Replace callback
         def replace(match):
@@ -297,12 +1135,12 @@ class SearchIndex:
             # surround with zero-width whitespace for efficient indexing
             return "".join([
                 "\u200b",
-                "\u200b".join(jieba.cut(value.encode("utf-8"))),
+                _segment_han(value, *dicts),
                 "\u200b",
             ])
 
         # Return string with segmented occurrences
-        return expr.sub(replace, data).strip("\u200b")
+        return han.sub(replace, data).strip("\u200b")
 
 # -----------------------------------------------------------------------------
 
@@ -310,13 +1148,17 @@ class SearchIndex:
 class Element:
     """
     An element with attributes, essentially a small wrapper object for the
-    parser to access attributes in other callbacks than handle_starttag.
+    parser to access attributes in other callbacks than handle_starttag. As
+    one element is created per tag, attributes are only retained if needed.
     """
 
+    # Use slots, as elements are created for every tag
+    __slots__ = ("tag", "attrs")
+
     # Initialize HTML element
     def __init__(self, tag, attrs = None):
         self.tag   = tag
-        self.attrs = attrs or {}
+        self.attrs = attrs
 
     # String representation
     def __repr__(self):
@@ -335,7 +1177,7 @@ class Element:
 
     # Check whether the element should be excluded
     def is_excluded(self):
-        return "data-search-exclude" in self.attrs
+        return bool(self.attrs) and "data-search-exclude" in self.attrs
 
 # -----------------------------------------------------------------------------
 
@@ -346,6 +1188,9 @@ class Section:
     headline with a certain level (h1-h6). Internally used by the parser.
     """
 
+    # Use slots, as sections are created for every heading
+    __slots__ = ("el", "depth", "text", "title", "id")
+
     # Initialize HTML section
     def __init__(self, el, depth = 0):
         self.el = el
@@ -382,20 +1227,9 @@ class Parser(HTMLParser):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        # Tags to skip
-        self.skip = set([
-            "object",                  # Objects
-            "script",                  # Scripts
-            "style"                    # Styles
-        ])
-
-        # Tags to keep
-        self.keep = set([
-            "p",                       # Paragraphs
-            "code", "pre",             # Code blocks
-            "li", "ol", "ul",          # Lists
-            "sub", "sup"               # Sub- and superscripts
-        ])
+        # Tags to skip and keep
+        self.skip = set(skip)
+        self.keep = set(keep)
 
         # Current context and section
         self.context = []
@@ -406,19 +1240,26 @@ class Parser(HTMLParser):
 
     # Called at the start of every HTML tag
     def handle_starttag(self, tag, attrs):
-        attrs = dict(attrs)
+        if tag in void:
+            return
 
-        # Ignore self-closing tags
-        el = Element(tag, attrs)
-        if not tag in void:
-            self.context.append(el)
+        # Retain attributes only for elements that are accessed in other
+        # callbacks, i.e., headings, permalinks and skipped elements
+        skipped = _is_skipped(attrs)
+        if tag in headings or skipped or (
+            tag == "a" and _attr(attrs, "class") == "headerlink"
+        ):
+            el = Element(tag, dict(attrs))
         else:
-            return
+            el = Element(tag)
+
+        # Add element to context
+        self.context.append(el)
 
         # Handle heading
-        if tag in ([f"h{x}" for x in range(1, 7)]):
+        if tag in headings:
             depth = len(self.context)
-            if "id" in attrs:
+            if "id" in el.attrs:
 
                 # Ensure top-level section
                 if tag != "h1" and not self.data:
@@ -428,7 +1269,7 @@ class Parser(HTMLParser):
                 # Set identifier, if not first section
                 self.section = Section(el, depth)
                 if self.data:
-                    self.section.id = attrs["id"]
+                    self.section.id = el.attrs["id"]
 
                 # Append section to list
                 self.data.append(self.section)
@@ -438,18 +1279,11 @@ class Parser(HTMLParser):
             self.section = Section(Element("hx"))
             self.data.append(self.section)
 
-        # Handle special cases to skip
-        for key, value in attrs.items():
-
-            # Skip block if explicitly excluded from search
-            if key == "data-search-exclude":
-                self.skip.add(el)
-                return
-
-            # Skip line numbers - see https://bit.ly/3GvubZx
-            if key == "class" and value == "linenodiv":
-                self.skip.add(el)
-                return
+        # Skip block if explicitly excluded from search, or if it contains line
+        # numbers - see https://bit.ly/3GvubZx
+        if skipped:
+            self.skip.add(el)
+            return
 
         # Render opening tag if kept
         if not self.skip.intersection(self.context) and tag in self.keep:
@@ -533,7 +1367,7 @@ class Parser(HTMLParser):
         if self.section.el in self.context:
             permalink = False
             for el in self.context:
-                if el.tag == "a" and el.attrs.get("class") == "headerlink":
+                if el.tag == "a" and el.attrs and el.attrs.get("class") == "headerlink":
                     permalink = True
 
             # Ignore permalinks
@@ -555,6 +1389,462 @@ class Parser(HTMLParser):
                 escape(data, quote = False)
             )
 
+# -----------------------------------------------------------------------------
+
+# HTML parser (fast)
+class FastParser(HTMLParser):
+    """
+    This parser yields exactly the same sections as the default parser, but
+    tracks its state in constant time per callback. Instead of intersecting
+    the context with the tags to skip, it counts open elements per tag and
+    open elements that must be skipped, and instead of scanning the section
+    title or text for opening tags, it tracks positions of opening tags and
+    non-whitespace values for each list of values it appends to.
+    """
+
+    # Initialize HTML parser
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Tags to skip (tags of explicitly excluded elements are added)
+        self.skip = set(skip)
+        self.keep = keep
+
+        # Current context and section
+        self.context = []
+        self.section = None
+
+        # Number of open elements per tag, open elements that must be skipped,
+        # and open permalinks, which are excluded from section titles
+        self.count = defaultdict(int)
+        self.count_skip = 0
+        self.count_permalink = 0
+        self.permalink = []
+
+        # Positions of opening tags and non-whitespace values per list
+        self.marks = {}
+
+        # All parsed sections
+        self.data = []
+
+    # Called at the start of every HTML tag
+    def handle_starttag(self, tag, attrs):
+        if tag in void:
+            return
+
+        # Add element to context
+        self.context.append(tag)
+        self.count[tag] += 1
+        if tag in self.skip:
+            self.count_skip += 1
+
+        # Track permalinks, which are excluded from section titles
+        if tag == "a":
+            permalink = _attr(attrs, "class") == "headerlink"
+            self.permalink.append(permalink)
+            self.count_permalink += permalink
+
+        # Handle heading
+        if tag in headings:
+            depth = len(self.context)
+            el = Element(tag, dict(attrs))
+            if "id" in el.attrs:
+
+                # Ensure top-level section
+                if tag != "h1" and not self.data:
+                    self.section = Section(Element("hx"), depth)
+                    self.data.append(self.section)
+
+                # Set identifier, if not first section
+                self.section = Section(el, depth)
+                if self.data:
+                    self.section.id = el.attrs["id"]
+
+                # Append section to list
+                self.data.append(self.section)
+
+        # Handle preface - ensure top-level section
+        if not self.section:
+            self.section = Section(Element("hx"))
+            self.data.append(self.section)
+
+        # Skip block if explicitly excluded from search, or if it contains line
+        # numbers - see https://bit.ly/3GvubZx. Note that skipping applies to
+        # all open elements with the same tag, as with the default parser.
+        if _is_skipped(attrs):
+            if tag not in self.skip:
+                self.skip.add(tag)
+                self.count_skip += self.count[tag]
+            return
+
+        # Render opening tag if kept
+        if not self.count_skip and tag in self.keep:
+            self._append(self._target(), f"<{tag}>", tag)
+
+    # Called at the end of every HTML tag
+    def handle_endtag(self, tag):
+        if not self.context or self.context[-1] != tag:
+            return
+
+        # Check whether we're exiting the current context, which happens when
+        # a headline is nested in another element - see the default parser
+        if self.section.depth > len(self.context):
+            for section in reversed(self.data):
+                if section.depth <= len(self.context):
+                    self.section.depth = float("inf")
+                    self.section = section
+                    break
+
+        # Remove element from context
+        self.context.pop()
+        self.count[tag] -= 1
+        if tag == "a":
+            self.count_permalink -= self.permalink.pop()
+
+        # Remove element from skip list
+        if tag in self.skip:
+            self.count_skip -= 1
+            if tag not in skip:
+                self.skip.remove(tag)
+                self.count_skip -= self.count[tag]
+            return
+
+        # Render closing tag if kept
+        if not self.count_skip and tag in self.keep:
+            data = self._target()
+            first, marks = self.marks.setdefault(id(data), ({}, []))
+
+            # Search for first corresponding opening tag - the default parser
+            # raises in this case as well, so we keep the behavior consistent
+            if tag not in first:
+                raise ValueError(f"'<{tag}>' is not in list")
+
+            # Remove element if empty (or only whitespace), which is the case
+            # when no non-whitespace value follows the opening tag
+            index = first[tag]
+            if marks[-1] == index:
+                del data[index:]
+                del first[tag]
+                marks.pop()
+
+            # Append to section title or text
+            else:
+                self._append(data, f"</{tag}>")
+
+    # Called for the text contents of each tag
+    def handle_data(self, data):
+        if self.count_skip:
+            return
+
+        # Collapse whitespace in non-pre contexts
+        if not self.count["pre"]:
+            if not data.isspace():
+                data = data.replace("\n", " ")
+            else:
+                data = " "
+
+        # Handle preface - ensure top-level section
+        if not self.section:
+            self.section = Section(Element("hx"))
+            self.data.append(self.section)
+
+        # Handle section headline, ignoring permalinks
+        if self.count[self.section.el.tag]:
+            if not self.count_permalink:
+                self._append(self.section.title, escape(data, quote = False))
+
+        # Collapse adjacent whitespace
+        elif data.isspace():
+            text = self.section.text
+            if not text or not text[-1].isspace() or self.count["pre"]:
+                self._append(text, data)
+
+        # Handle everything else
+        else:
+            self._append(self.section.text, escape(data, quote = False))
+
+    # -------------------------------------------------------------------------
+
+    # Retrieve section title or text, depending on whether we're inside the
+    # section title, i.e., an element with the same tag as the heading is open
+    def _target(self):
+        if self.count[self.section.el.tag]:
+            return self.section.title
+        else:
+            return self.section.text
+
+    # Append value to the given list, and track positions of the first opening
+    # tag of each kind and of all non-whitespace values
+    def _append(self, data, value, tag = None):
+        first, marks = self.marks.setdefault(id(data), ({}, []))
+        if tag and tag not in first:
+            first[tag] = len(data)
+
+        # Track position of non-whitespace value
+        if not value.isspace():
+            marks.append(len(data))
+
+        # Append value
+        data.append(value)
+
+# -----------------------------------------------------------------------------
+# Functions
+# -----------------------------------------------------------------------------
+
+# Import jieba and set dictionaries, if given - this is deferred until the first
+# run of Han characters is found, and happens once per process and dictionaries
+@functools.lru_cache(maxsize = None)
+def _load_jieba(jieba_dict, jieba_dict_user):
+    import jieba
+
+    # Set jieba dictionary, if given
+    if jieba_dict:
+        path = os.path.normpath(jieba_dict)
+        if os.path.isfile(path):
+            jieba.set_dictionary(path)
+            log.debug(f"Loading jieba dictionary: {path}")
+
+    # Set jieba user dictionary, if given
+    if jieba_dict_user:
+        path = os.path.normpath(jieba_dict_user)
+        if os.path.isfile(path):
+            jieba.load_userdict(path)
+            log.debug(f"Loading jieba user dictionary: {path}")
+
+    # Return module
+    return jieba
+
+# Segment run of Han characters - identical runs are likely to repeat across
+# sections and pages, so we cache the most recently segmented runs
+@functools.lru_cache(maxsize = 4096)
+def _segment_han(value, jieba_dict, jieba_dict_user):
+    jieba = _load_jieba(jieba_dict, jieba_dict_user)
+    return "\u200b".join(jieba.cut(value.encode("utf-8")))
+
+# Return value of attribute from the list of attributes passed to the parser,
+# without creating a dictionary - if given more than once, the last one wins
+def _attr(attrs, name):
+    value = None
+    for key, data in attrs:
+        if key == name:
+            value = data
+
+    # Return value
+    return value
+
+# Check whether an element with the given attributes must be skipped, because
+# it's explicitly excluded from search or contains line numbers
+def _is_skipped(attrs):
+    if not attrs:
+        return False
+
+    # Check for exclusion before the class, as exclusion can't be overridden
+    for key, _ in attrs:
+        if key == "data-search-exclude":
+            return True
+
+    # Check for line numbers
+    return _attr(attrs, "class") == "linenodiv"
+
+# Write search index to the given directory, and shards together with a manifest
+# listing all shards, if enabled - returns the paths of all written files
+def _write_search_index(search_index, base, prev = None):
+    path = os.path.join(base, "search_index.json")
+    paths = [path]
+
+    # Generate and stream search index to file
+    _write_to_file(path, search_index.generate_search_index(prev))
+
+    # Write search index in compact format, if enabled, which is written next
+    # to the search index, as the search worker only reads the default format
+    if search_index.config.get("compact"):
+        paths.append(os.path.join(base, "search_index.compact.json"))
+        _write_to_file(paths[-1], search_index.generate_search_index_compact())
+
+    # Write prebuilt search index, if enabled, which is written next to the
+    # search index, so clients that don't load it don't need to download it
+    if search_index.config.get("prebuild_index"):
+        paths.append(os.path.join(base, "search_index.lunr.json"))
+        _write_to_file(paths[-1], search_index.generate_search_index_lunr())
+
+    # Write search index shards and manifest, if enabled
+    if search_index.config.get("shards"):
+        shards = []
+        for index, (sections, chunks) in enumerate(
+            search_index.generate_search_index_shards()
+        ):
+            file = posixpath.join("shards", f"{index}.json")
+            paths.append(os.path.join(base, file))
+            size, digest = _write_to_file(paths[-1], chunks)
+
+            # Add shard to manifest
+            shards.append({
+                "location": file,
+                "sections": sections,
+                "size": size,
+                "hash": digest
+            })
+
+        # Write manifest, which lists all shards
+        paths.append(os.path.join(base, "manifest.json"))
+        _write_to_file(paths[-1], [
+            json.dumps({ "shards": shards }, separators = (",", ":"))
+        ])
+
+    # Write delta against search index of previous build, if enabled, which
+    # is named after the version of the search index of the previous build
+    if search_index.config.get("delta"):
+        delta = search_index.generate_search_index_delta()
+        if delta:
+            version, chunks = delta
+            paths.append(os.path.join(base, "delta", f"{version}.json"))
+            _write_to_file(paths[-1], chunks)
+
+    # Return paths of written files
+    return paths
+
+# Write chunks to file, and return size and digest of the file - chunks are
+# written to a temporary file, which is then moved to the given path, so the
+# file is never left truncated if writing is interrupted or the disk is full
+def _write_to_file(path, chunks):
+    os.makedirs(os.path.dirname(path), exist_ok = True)
+
+    # Write chunks and compute size and digest while writing
+    size, digest = 0, sha1()
+    temp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp, "wb") as f:
+            for chunk in chunks:
+                data = chunk.encode("utf-8")
+                size += len(data)
+                digest.update(data)
+                f.write(data)
+
+        # Move file to path
+        os.replace(temp, path)
+
+    # Remove temporary file on error
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+    # Return size and digest
+    return size, digest.hexdigest()
+
+# Load manifest of cached entries, which is a list of digests - manifests that
+# can't be read are treated as empty, as entries are then only retained
+def _load_manifest(path):
+    try:
+        with open(path, encoding = "utf-8") as f:
+            data = json.load(f)
+            if isinstance(data, list):
+                return data
+    except (OSError, ValueError):
+        pass
+
+    # Return empty manifest
+    return []
+
+# Truncate UTF-8 encoded text to the given number of bytes, so that it doesn't
+# end within a character, a tag or an entity. Tags that are left open are not
+# closed, as they're closed when the text is rendered by the browser.
+def _truncate(data, size):
+    text = data[:size].decode("utf-8", "ignore")
+
+    # Ensure text doesn't end within a tag - text is escaped, so any opening
+    # angle bracket is the start of a tag
+    start = text.rfind("<")
+    if start > text.rfind(">"):
+        text = text[:start]
+
+    # Ensure text doesn't end within an entity, for the same reason
+    start = text.rfind("&")
+    if start > text.rfind(";"):
+        text = text[:start]
+
+    # Return truncated text
+    return text.rstrip()
+
+# Convert escaped text with markup to plain text, and return it together with
+# the offsets of code spans. Text is escaped, so every opening angle bracket is
+# the start of one of the tags that are kept, and adjacent blocks are separated
+# by a single space. Entities are left escaped, as clients render the text as
+# HTML, so offsets never fall within an entity, and are measured on the escaped
+# text in UTF-16 code units, as in browsers.
+def _plain(value):
+    parts, spans = [], []
+    offset, start, depth = 0, 0, 0
+
+    # Text and tags alternate, as the expression contains a group
+    for position, part in enumerate(markup.split(value)):
+        if position % 2 == 0:
+            if part:
+                parts.append(part)
+                offset += _length(part)
+
+        # Start code span on outermost opening tag
+        elif part == "code":
+            if not depth:
+                start = offset
+            depth += 1
+
+        # End code span on outermost closing tag
+        elif part == "/code":
+            depth = max(depth - 1, 0)
+            if not depth and offset > start:
+                spans.append([start, offset])
+
+        # Separate blocks by whitespace
+        elif part.lstrip("/") in blocks:
+            if parts and not parts[-1][-1].isspace():
+                parts.append(" ")
+                offset += 1
+
+    # End code span that was left open
+    if depth and offset > start:
+        spans.append([start, offset])
+
+    # Strip whitespace, and shift and shorten code spans accordingly
+    text = "".join(parts)
+    shift = _length(text) - _length(text.lstrip())
+    text = text.strip()
+    length = _length(text)
+    spans = [
+        [max(start - shift, 0), min(end - shift, length)]
+            for start, end in spans if end - shift > 0 and start - shift < length
+    ]
+
+    # Return plain text and code spans
+    return text, spans
+
+# Compute length of string in UTF-16 code units, as used by JavaScript
+def _length(value):
+    if value.isascii():
+        return len(value)
+    else:
+        return len(value.encode("utf-16-le")) // 2
+
+# Index page in worker process and return entries, number of excluded sections
+# and the time it took to index the page
+def _index_page(config, page):
+    index = SearchIndex(**{ **config, "concurrency": 1 })
+    return index._index(page)
+
+# Create snapshot of page with all data necessary for indexing, as pages can't
+# be sent to worker processes, since they reference the entire configuration
+def _snapshot(page):
+    return SimpleNamespace(
+        url = page.url,
+        title = page.title,
+        content = page.content,
+        toc = page.toc,
+        meta = {
+            key: page.meta[key]
+                for key in ["title", "tags", "search"] if key in page.meta
+        }
+    )
+
 # -----------------------------------------------------------------------------
 # Data
 # -----------------------------------------------------------------------------
@@ -562,6 +1852,40 @@ class Parser(HTMLParser):
 # Set up logging
 log = logging.getLogger("mkdocs.material.search")
 
+# Expression to find search attributes, which are removed from pages
+attributes = re.compile(r"\s?data-search-\w+=\"[^\"]+\"")
+
+# Expression to find runs of Han characters
+han = re.compile(r"(\p{IsHan}+)", re.UNICODE)
+
+# Expression to split text into text and tags that are kept
+markup = re.compile(r"<(/?\w+)>")
+
+# Tags that are headings
+headings = set([f"h{x}" for x in range(1, 7)])
+
+# Tags that are skipped in their entirety
+skip = set([
+    "object",                          # Objects
+    "script",                          # Scripts
+    "style"                            # Styles
+])
+
+# Tags that are kept as part of the index
+keep = set([
+    "p",                               # Paragraphs
+    "code", "pre",                     # Code blocks
+    "li", "ol", "ul",                  # Lists
+    "sub", "sup"                       # Sub- and superscripts
+])
+
+# Tags that are kept and separate blocks of text
+blocks = set([
+    "p",                               # Paragraphs
+    "pre",                             # Code blocks
+    "li", "ol", "ul"                   # Lists
+])
+
 # Tags that are self-closing
 void = set([
     "area",                            # Image map areas
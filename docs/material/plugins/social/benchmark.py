@@ -0,0 +1,143 @@
+# #
+#   Copyright (c) 2025 Aetherinox
+#
+#   Permission is hereby granted, free of charge, to any person obtaining a copy
+#   of this software and associated documentation files (the "Software"), to
+#   deal in the Software without restriction, including without limitation the
+#   rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#   sell copies of the Software, and to permit persons to whom the Software is
+#   furnished to do so, subject to the following conditions:
+#
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON-INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#   IN THE SOFTWARE.
+# #
+
+
+import argparse
+import concurrent.futures
+import random
+import sys
+import time
+
+from collections import defaultdict
+from io import BytesIO
+
+from .plugin import SocialPlugin, colors
+
+try:
+    from PIL import Image
+except ImportError:
+    pass
+
+# -----------------------------------------------------------------------------
+# Functions
+# -----------------------------------------------------------------------------
+
+# Benchmark rendering of social cards with the given font, driving the plugin
+# directly without a full MkDocs build, and report cards per second with and
+# without encoding cards as PNG - run with:
+#
+#   python -m material.plugins.social.benchmark --font Roboto-Regular.ttf
+#
+# If no logo is given, a solid square is used as a logo.
+def main(argv = None):
+    parser = argparse.ArgumentParser(
+        prog = "python -m material.plugins.social.benchmark",
+        description = "Benchmark rendering of social cards."
+    )
+    parser.add_argument("--cards", type = int, default = 100)
+    parser.add_argument("--seed", type = int, default = 1)
+    parser.add_argument("--font", required = True)
+    parser.add_argument("--font-bold")
+    parser.add_argument("--logo")
+    args = parser.parse_args(argv)
+
+    # Check dependencies
+    if "Image" not in globals():
+        parser.error("Pillow not found. Install with: pip install pillow")
+
+    # Set up plugin with colors, font and logo, as done in worker processes
+    plugin = SocialPlugin()
+    plugin.color = colors["indigo"]
+    plugin.font = defaultdict(lambda: args.font, {
+        "Bold": args.font_bold or args.font
+    })
+
+    # Load logo or create solid square
+    logo = Image.new(mode = "RGBA", size = (144, 144), color = "#ffffff")
+    if args.logo:
+        logo = plugin._load_resized_logo(args.logo)
+
+    # Set logo, which is accessed through a promise when rendering
+    plugin._resized_logo_promise = concurrent.futures.Future()
+    plugin._resized_logo_promise.set_result(logo)
+
+    # Generate titles and descriptions, which are not part of the measurement
+    rng = random.Random(args.seed)
+    cards = [
+        (_sentence(rng, 2, 12), _sentence(rng, 6, 30))
+            for _ in range(args.cards)
+    ]
+
+    # Render first card, so fonts are loaded before measuring
+    plugin._render_card("Site", *cards[0])
+
+    # Render cards
+    start = time.perf_counter()
+    for title, description in cards:
+        plugin._render_card("Site", title, description)
+
+    # Render cards and encode as PNG
+    middle = time.perf_counter()
+    for title, description in cards:
+        plugin._render_card("Site", title, description).save(
+            BytesIO(), format = "png"
+        )
+
+    # Report results
+    end = time.perf_counter()
+    report([
+        ("Cards", f"{args.cards}"),
+        ("Rendering", f"{args.cards / (middle - start):.1f} cards/s"),
+        ("Rendering + PNG", f"{args.cards / (end - middle):.1f} cards/s")
+    ])
+
+# Report results as a table
+def report(rows):
+    width = max(len(key) for key, _ in rows)
+    for key, value in rows:
+        sys.stdout.write(f"{key.ljust(width)}  {value}\n")
+
+# -----------------------------------------------------------------------------
+
+# Generate sentence with the given minimum and maximum number of words
+def _sentence(rng, lower, upper):
+    return " ".join(
+        rng.choice(words) for _ in range(rng.randint(lower, upper))
+    ).capitalize()
+
+# -----------------------------------------------------------------------------
+# Data
+# -----------------------------------------------------------------------------
+
+# Words for generating titles and descriptions
+words = [
+    "build", "card", "configuration", "content", "deploy", "document",
+    "extension", "font", "guide", "image", "install", "layout", "logo",
+    "markdown", "navigation", "page", "plugin", "reference", "search",
+    "setup", "site", "social", "theme", "version"
+]
+
+# -----------------------------------------------------------------------------
+
+# Run benchmark
+if __name__ == "__main__":
+    main()
@@ -20,8 +20,10 @@
 #   IN THE SOFTWARE.
 # #
 
+import os
+
 from mkdocs.config.base import Config
-from mkdocs.config.config_options import Deprecated, Type
+from mkdocs.config.config_options import Choice, Deprecated, Type
 
 # -----------------------------------------------------------------------------
 # Classes
@@ -30,12 +32,17 @@ from mkdocs.config.config_options import Deprecated, Type
 # Social plugin configuration
 class SocialConfig(Config):
     enabled = Type(bool, default = True)
+    concurrency = Type(int, default = max(1, os.cpu_count() - 1))
     cache_dir = Type(str, default = ".cache/plugin/social")
 
     # Settings for social cards
     cards = Type(bool, default = True)
     cards_dir = Type(str, default = "assets/images/social")
     cards_layout_options = Type(dict, default = {})
+    cards_backend = Choice(("thread", "process"), default = "thread")
+    cards_materialize = Choice(
+        ("reflink", "hardlink", "copy"), default = "reflink"
+    )
 
     # Deprecated settings
     cards_color = Deprecated(
@@ -34,13 +34,17 @@
 # -----------------------------------------------------------------------------
 
 import concurrent.futures
+import errno
+import filecmp
 import functools
+import json
 import logging
 import os
 import posixpath
 import re
 import requests
 import sys
+import threading
 
 from collections import defaultdict
 from hashlib import md5
@@ -51,12 +55,17 @@ from mkdocs.plugins import BasePlugin
 from shutil import copyfile
 from tempfile import TemporaryFile
 from zipfile import ZipFile
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 try:
     from cairosvg import svg2png
     from PIL import Image, ImageDraw, ImageFont
 except ImportError:
     pass
 
+from ... import __version__
 from .config import SocialConfig
 
 
@@ -68,7 +77,21 @@ from .config import SocialConfig
 class SocialPlugin(BasePlugin[SocialConfig]):
 
     def __init__(self):
-        self._executor = concurrent.futures.ThreadPoolExecutor(4)
+        self._executor = None
+        self._process_pool = None
+        self._image_promises = []
+        self._renders = {}
+
+        # Initialize static layers of social cards by site name
+        self._templates = {}
+        self._templates_lock = threading.Lock()
+
+        # Initialize incremental builds
+        self.is_dirty = False
+
+    # Determine whether we're running under dirty reload
+    def on_startup(self, *, command, dirty):
+        self.is_dirty = dirty
 
     # Retrieve configuration
     def on_config(self, config):
@@ -135,11 +158,57 @@ class SocialPlugin(BasePlugin[SocialConfig]):
             "text": options.get("color", self.color["text"])
         }
 
+        # Reset static layers of social cards and fonts, as colors, logo or font
+        # might change, and the plugin is retained across rebuilds when serving
+        self._templates = {}
+        self._get_font.cache_clear()
+
+        # Shut down thread and process pool of the previous build, if any, which
+        # are left running when the previous build failed before cards were saved
+        self._shutdown()
+
+        # Initialize thread pool, which renders cards, unless they're rendered
+        # in worker processes, and materializes them from the cache
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            self.config.concurrency
+        )
+
         # Retrieve logo and font
-        self._resized_logo_promise = self._executor.submit(self._load_resized_logo, config)
+        self._resized_logo_promise = self._executor.submit(
+            self._load_resized_logo, *self._resolve_logo(config)
+        )
         self.font = self._load_font(config)
 
+        # Retain arguments for worker processes, if cards are rendered in worker
+        # processes, each of which loads the font and logo once when started -
+        # the process pool is created when the first card must be rendered
+        if self.config.cards_backend == "process":
+            self._worker_args = (
+                self.color, dict(self.font), *self._resolve_logo(config)
+            )
+
+        # Compute fingerprint of all render inputs shared by all cards, and
+        # load manifest of cards that were rendered in the previous build. The
+        # cache might be shared by several projects, e.g., one per language,
+        # so each project, identified by its configuration file and site
+        # directory, keeps its own manifest.
+        self.fingerprint = self._fingerprint(config)
+        name = json.dumps([config.config_file_path, config.site_dir])
+        self.manifest_path = os.path.join(
+            self.cache, "manifests", f"{md5(name.encode('utf-8')).hexdigest()}.json"
+        )
+        self.manifest = self._load_manifest(self.manifest_path)
+        if self.manifest["cards"] and self.manifest["fingerprint"] != self.fingerprint:
+            log.info(
+                "Layout, colors, font or logo of social cards changed, "
+                "cards are rendered again"
+            )
+
         self._image_promises = []
+        self._cards = {}
+
+        # Initialize rendering jobs of worker processes by cache path
+        self._renders = {}
 
     # Create social cards
     def on_page_markdown(self, markdown, page, config, files):
@@ -187,18 +256,53 @@ class SocialPlugin(BasePlugin[SocialConfig]):
             )
             sys.exit(1)
 
-        # Generate social card if not in cache
-        hash = md5("".join([
+        # Generate social card if not in cache - the cache is keyed by all
+        # render inputs, so changes to layout, colors, font or logo apply
+        hash = md5(json.dumps([
+            self.fingerprint,
             site_name,
             str(title),
             description
         ]).encode("utf-8"))
+        self._cards[page.file.src_uri] = hash.hexdigest()
         file = os.path.join(self.cache, f"{hash.hexdigest()}.png")
-        self._image_promises.append(self._executor.submit(
-            self._cache_image,
-            cache_path = file, dest_path = path,
-            render_function = lambda: self._render_card(site_name, title, description)
-        ))
+
+        # Render social card in worker process, if not in cache, and only ship
+        # the inputs of the page - identical cards are only rendered once
+        if self.config.cards_backend == "process":
+            if file not in self._renders:
+                if os.path.isfile(file):
+                    promise = concurrent.futures.Future()
+                    promise.set_result(file)
+                else:
+                    if not self._process_pool:
+                        self._process_pool = concurrent.futures.ProcessPoolExecutor(
+                            self.config.concurrency,
+                            initializer = _init_worker,
+                            initargs = self._worker_args
+                        )
+
+                    # Submit job to process pool
+                    promise = self._process_pool.submit(
+                        _render_card_in_worker,
+                        file, site_name, title, description
+                    )
+
+                # Remember rendering job
+                self._renders[file] = promise
+
+            # Materialize social card from cache once rendered
+            self._image_promises.append(
+                self._materialize_when_rendered(self._renders[file], path)
+            )
+
+        # Otherwise render social card in thread
+        else:
+            self._image_promises.append(self._executor.submit(
+                self._cache_image,
+                cache_path = file, dest_path = path,
+                render_function = lambda: self._render_card(site_name, title, description)
+            ))
 
         # Inject meta tags into page
         meta = page.meta.get("meta", [])
@@ -212,36 +316,153 @@ class SocialPlugin(BasePlugin[SocialConfig]):
         for promise in self._image_promises:
             promise.result()
 
+        # Shut down thread and process pool
+        self._shutdown()
+
+        # Update manifest - under dirty reload, only changed pages are built,
+        # so cards of all other pages are retained
+        cards = self._cards
+        if self.is_dirty:
+            cards = { **self.manifest["cards"], **self._cards }
+
+        # Remove cards from cache that are not used anymore, i.e., which were
+        # rendered with other render inputs, or for pages that were removed,
+        # unless they're used by other projects sharing the cache
+        used = set(cards.values())
+        for path in self._list_manifests():
+            if path != self.manifest_path:
+                used.update(self._load_manifest(path)["cards"].values())
+
+        # Remove cards that were used in the previous build of this project
+        for hash in set(self.manifest["cards"].values()) - used:
+            path = os.path.join(self.cache, f"{hash}.png")
+            if os.path.isfile(path):
+                os.remove(path)
+
+        # Persist manifest for next build
+        self.manifest = { "fingerprint": self.fingerprint, "cards": cards }
+        self._save_manifest(self.manifest_path, self.manifest)
+
+    # Shut down thread and process pool
+    def on_shutdown(self):
+        self._shutdown()
+
     # -------------------------------------------------------------------------
 
-    # Render image to cache (if not present), then copy from cache to site
+    # Shut down thread and process pool, if any, cancelling pending jobs, which
+    # only exist when the build failed before cards were saved
+    def _shutdown(self):
+        for promise in [*self._image_promises, *self._renders.values()]:
+            promise.cancel()
+
+        # Shut down thread pool
+        if self._executor:
+            self._executor.shutdown()
+            self._executor = None
+
+        # Shut down process pool
+        if self._process_pool:
+            self._process_pool.shutdown()
+            self._process_pool = None
+
+    # Materialize social card from cache in a thread once it was rendered in a
+    # worker process, so materializing overlaps with rendering of other cards,
+    # and return a promise that is resolved when the card was materialized
+    def _materialize_when_rendered(self, render, path):
+        promise = concurrent.futures.Future()
+
+        # Materialize social card, and resolve promise with the outcome, as
+        # errors in callbacks are only logged and would otherwise be lost
+        def materialize(render):
+            try:
+                _materialize(
+                    render.result(), path, self.config.cards_materialize
+                )
+            except Exception as e:
+                promise.set_exception(e)
+            else:
+                promise.set_result(path)
+
+        # Submit job to thread pool once social card was rendered
+        render.add_done_callback(
+            lambda render: self._executor.submit(materialize, render)
+        )
+        return promise
+
+    # Render image to cache (if not present), then materialize it in site
     def _cache_image(self, cache_path, dest_path, render_function):
         if not os.path.isfile(cache_path):
             image = render_function()
             image.save(cache_path)
 
-        # Copy file from cache
-        copyfile(cache_path, dest_path)
+        # Materialize file from cache
+        _materialize(cache_path, dest_path, self.config.cards_materialize)
+
+    # Compute fingerprint of all render inputs that are shared by all cards,
+    # i.e., layout options, colors, font files and logo - font files and logo
+    # are hashed by their contents, so replacing them invalidates all cards
+    def _fingerprint(self, config):
+        hash = md5(json.dumps([
+            __version__,
+            self.config.cards_layout_options,
+            self.color
+        ], sort_keys = True, default = str).encode("utf-8"))
+
+        # Hash font files of all weights that are used
+        for kind in ["Bold", "Regular"]:
+            with open(self.font[kind], "rb") as f:
+                hash.update(f.read())
+
+        # Hash logo and fill color, if any
+        path, fill = self._resolve_logo(config)
+        with open(path, "rb") as f:
+            hash.update(f.read())
+        hash.update(str(fill).encode("utf-8"))
+
+        # Return fingerprint
+        return hash.hexdigest()
+
+    # Load manifest of cards of the previous build - manifests that can't be
+    # read are treated as empty, so no cards are removed
+    def _load_manifest(self, path):
+        if os.path.isfile(path):
+            try:
+                with open(path, encoding = "utf-8") as f:
+                    manifest = json.load(f)
+                    if isinstance(manifest.get("cards"), dict):
+                        return manifest
+            except (OSError, ValueError, AttributeError):
+                pass
+
+            # Manifest can't be read
+            log.debug(f"Ignoring invalid manifest of social cards: {path}")
+
+        # Return empty manifest
+        return { "fingerprint": None, "cards": {} }
+
+    # Save manifest of cards of this build
+    def _save_manifest(self, path, manifest):
+        _write_json(path, manifest)
+
+    # List manifests of cards of all projects sharing the cache
+    def _list_manifests(self):
+        base = os.path.join(self.cache, "manifests")
+        if not os.path.isdir(base):
+            return []
+
+        # Return paths of manifests
+        return [
+            os.path.join(base, file)
+                for file in os.listdir(base) if file.endswith(".json")
+        ]
 
     @functools.lru_cache(maxsize=None)
     def _get_font(self, kind, size):
         return ImageFont.truetype(self.font[kind], size)
 
-    # Render social card
+    # Render social card, starting from a copy of the static layer
     def _render_card(self, site_name, title, description):
-        # Render background and logo
-        image = self._render_card_background((1200, 630), self.color["fill"])
-        image.alpha_composite(
-            self._resized_logo_promise.result(),
-            (1200 - 228, 64 - 4)
-        )
-
-        # Render site name
-        font = self._get_font("Bold", 36)
-        image.alpha_composite(
-            self._render_text((826, 48), font, site_name, 1, 20),
-            (64 + 4, 64)
-        )
+        image = self._get_card_template(site_name).copy()
 
         # Render page title
         font = self._get_font("Bold", 92)
@@ -260,6 +481,37 @@ class SocialPlugin(BasePlugin[SocialConfig]):
         # Return social card image
         return image
 
+    # Retrieve static layer of social card, rendering it on first use - threads
+    # that need it in the meantime wait, so it's only rendered once per build
+    def _get_card_template(self, site_name):
+        with self._templates_lock:
+            if site_name not in self._templates:
+                self._templates[site_name] = \
+                    self._render_card_template(site_name)
+
+            # Return static layer
+            return self._templates[site_name]
+
+    # Render static layer of social card, i.e., background, logo and site name,
+    # which are identical for all cards of a build
+    def _render_card_template(self, site_name):
+        # Render background and logo
+        image = self._render_card_background((1200, 630), self.color["fill"])
+        image.alpha_composite(
+            self._resized_logo_promise.result(),
+            (1200 - 228, 64 - 4)
+        )
+
+        # Render site name
+        font = self._get_font("Bold", 36)
+        image.alpha_composite(
+            self._render_text((826, 48), font, site_name, 1, 20),
+            (64 + 4, 64)
+        )
+
+        # Return static layer
+        return image
+
     # Render social card background
     def _render_card_background(self, size, fill):
         return Image.new(mode = "RGBA", size = size, color = fill)
@@ -269,10 +521,16 @@ class SocialPlugin(BasePlugin[SocialConfig]):
         image = Image.new(mode = "RGBA", size = (50, 50))
         return ImageDraw.Draw(image)
 
-    @functools.lru_cache(maxsize=None)
+    @functools.lru_cache(maxsize=4096)
     def _text_bounding_box(self, text, font):
         return self._tmp_context().textbbox((0, 0), text, font = font)
 
+    # Measure advance width of a word - words repeat across titles and
+    # descriptions, so advance widths are cached
+    @functools.lru_cache(maxsize=4096)
+    def _text_length(self, word, font):
+        return font.getlength(word)
+
     # Render social card text
     def _render_text(self, size, font, text, lmax, spacing = 0):
         width = size[0]
@@ -281,19 +539,42 @@ class SocialPlugin(BasePlugin[SocialConfig]):
         # Remove remnant HTML tags
         text = re.sub(r"(<[^>]+>)", "", text)
 
-        # Retrieve y-offset of textbox to correct for spacing
-        yoffset = 0
-
-        # Create drawing context and split text into lines
+        # Split text into lines, estimating the width of each line from the
+        # advance widths of its words, instead of measuring the line for each
+        # word, which is quadratic in the number of words. Kerning at word
+        # boundaries and overhang of the last glyph are accounted for by
+        # measuring the line whenever the estimate is close to the width,
+        # i.e., only at candidate break points.
+        space = self._text_length(" ", font)
+        tolerance = font.size / 4
+        length = 0
         for word in text.split(" "):
-            combine = " ".join(words + [word])
-            textbox = self._text_bounding_box(combine, font = font)
-            yoffset = textbox[1]
-            if not words or textbox[2] <= width:
+            advance = self._text_length(word, font)
+            offset = length + space if words else 0
+
+            # Check whether the word fits, measuring the line if necessary
+            fits = not words or offset + advance < width - tolerance
+            if not fits and offset + advance <= width + tolerance:
+                combine = " ".join(words + [word])
+                fits = self._text_bounding_box(combine, font)[2] <= width
+
+            # Add word to line, or start next line
+            if fits:
                 words.append(word)
+                length = offset + advance
             else:
                 lines.append(words)
                 words = [word]
+                length = advance
+
+        # Retrieve y-offset of textbox to correct for spacing, which is taken
+        # from the line the last word was added to, or which it didn't fit on
+        combine = words
+        if lines and len(words) == 1:
+            combine = lines[-1] + words
+
+        # Measure y-offset
+        yoffset = self._text_bounding_box(" ".join(combine), font)[1]
 
         # Join words for each line and create image
         lines.append(words)
@@ -359,19 +640,27 @@ class SocialPlugin(BasePlugin[SocialConfig]):
             { "name": "twitter:image", "content": url }
         ]
 
-    def _load_resized_logo(self, config, width = 144):
-        logo = self._load_logo(config)
+    def _load_resized_logo(self, path, fill = None, width = 144):
+        logo = self._load_logo(path, fill)
         height = int(width * logo.height / logo.width)
         return logo.resize((width, height))
 
     # Retrieve logo image or icon
-    def _load_logo(self, config):
+    def _load_logo(self, path, fill = None):
+
+        # Load SVG and convert to PNG
+        if path.endswith(".svg"):
+            return self._load_logo_svg(path, fill)
+
+        # Load PNG, JPEG, etc.
+        return Image.open(path).convert("RGBA")
+
+    # Resolve path of logo image or icon, and color to fill icons with
+    def _resolve_logo(self, config):
         theme = config.theme
 
         # Handle images (precedence over icons)
         if "logo" in theme:
-            _, extension = os.path.splitext(theme["logo"])
-
             path = os.path.join(config.docs_dir, theme["logo"])
 
             # Allow users to put the logo inside their custom_dir (theme["logo"] case)
@@ -380,12 +669,8 @@ class SocialPlugin(BasePlugin[SocialConfig]):
                 if os.path.exists(custom_dir_logo):
                     path = custom_dir_logo
 
-            # Load SVG and convert to PNG
-            if extension == ".svg":
-                return self._load_logo_svg(path)
-
-            # Load PNG, JPEG, etc.
-            return Image.open(path).convert("RGBA")
+            # Images are not filled
+            return path, None
 
         # Handle icons
         icon = theme["icon"] or {}
@@ -408,8 +693,8 @@ class SocialPlugin(BasePlugin[SocialConfig]):
             if os.path.exists(custom_dir_logo):
                 path = custom_dir_logo
 
-        # Load icon data and fill with color
-        return self._load_logo_svg(path, self.color["text"])
+        # Icons are filled with color
+        return path, self.color["text"]
 
     # Load SVG file and convert to PNG
     def _load_logo_svg(self, path, fill = None):
@@ -436,34 +721,88 @@ class SocialPlugin(BasePlugin[SocialConfig]):
             else:
                 name = "Roboto"
 
+        # Look up font weights in font manifest, so the cache, which contains
+        # thousands of social cards, doesn't need to be scanned on every build
+        manifest = self._load_font_manifest()
+        font = {
+            weight: os.path.join(self.cache, path)
+                for weight, path in manifest.get(name, {}).items()
+        }
+
+        # If font is not in manifest, or font files were removed, scan the font
+        # directory, and the cache itself for fonts cached by earlier versions
+        if not font or not all(map(os.path.isfile, font.values())):
+            font = self._find_font(name, os.path.join(self.cache, "fonts"))
+            if not font:
+                font = self._find_font(name, self.cache)
+
+            # If none found, fetch from Google and try again
+            if not font:
+                self._load_font_from_google(name)
+                font = self._find_font(name, os.path.join(self.cache, "fonts"))
+
+            # Update font manifest with paths relative to cache
+            if font:
+                manifest[name] = {
+                    weight: os.path.relpath(path, self.cache)
+                        for weight, path in font.items()
+                }
+                self._save_font_manifest(manifest)
+
+        # Return available font weights with fallback
+        return defaultdict(lambda: font["Regular"], font)
+
+    # Find font weights in the given directory - note these may be in subfolders
+    def _find_font(self, name, base):
+        if not os.path.isdir(base):
+            return {}
+
         # Google fonts can return varients like OpenSans_Condensed-Regular.ttf so
         # we only use the font requested e.g. OpenSans-Regular.ttf
         font_filename_base = name.replace(' ', '')
         filename_regex = re.escape(font_filename_base)+r"-(\w+)\.[ot]tf$"
 
         font = {}
-        # Check for cached files - note these may be in subfolders
-        for currentpath, folders, files in os.walk(self.cache):
+        for currentpath, folders, files in os.walk(base):
             for file in files:
+                if not file.endswith((".ttf", ".otf")):
+                    continue
+
                 # Map available font weights to file paths
                 fname = os.path.join(currentpath, file)
                 match = re.search(filename_regex, fname)
                 if match:
                     font[match.group(1)] = fname
 
-        # If none found, fetch from Google and try again
-        if len(font) == 0:
-            self._load_font_from_google(name)
-            for currentpath, folders, files in os.walk(self.cache):
-                for file in files:
-                    # Map available font weights to file paths
-                    fname = os.path.join(currentpath, file)
-                    match = re.search(filename_regex, fname)
-                    if match:
-                        font[match.group(1)] = fname
-
-        # Return available font weights with fallback
-        return defaultdict(lambda: font["Regular"], font)
+        # Return font weights
+        return font
+
+    # Load font manifest, mapping font families to weights and paths
+    def _load_font_manifest(self):
+        path = os.path.join(self.cache, "fonts", "manifest.json")
+        if os.path.isfile(path):
+            try:
+                with open(path, encoding = "utf-8") as f:
+                    manifest = json.load(f)
+
+                # Return font families with valid weights and paths - all other
+                # font families are looked up again and overwritten
+                return {
+                    name: font for name, font in manifest.items()
+                        if isinstance(font, dict) and all(
+                            isinstance(value, str) for value in font.values()
+                        )
+                }
+            except (OSError, ValueError, AttributeError):
+                log.debug(f"Ignoring invalid font manifest: {path}")
+
+        # Return empty manifest
+        return {}
+
+    # Save font manifest
+    def _save_font_manifest(self, manifest):
+        path = os.path.join(self.cache, "fonts", "manifest.json")
+        _write_json(path, manifest)
 
     # Retrieve font from Google Fonts
     def _load_font_from_google(self, name):
@@ -478,12 +817,111 @@ class SocialPlugin(BasePlugin[SocialConfig]):
         # Unzip fonts from temporary file
         zip = ZipFile(tmp)
         files = [file for file in zip.namelist() if file.endswith(".ttf") or file.endswith(".otf")]
-        zip.extractall(self.cache, files)
+        zip.extractall(os.path.join(self.cache, "fonts"), files)
 
         # Close and delete temporary file
         tmp.close()
         return files
 
+# -----------------------------------------------------------------------------
+# Functions
+# -----------------------------------------------------------------------------
+
+# Materialize file from cache at the given path, trying the given strategy and
+# all cheaper ones, i.e., a reflink, then a hardlink, and falling back to a copy
+# - nothing is done if the file at the given path has identical contents. Cached
+# files are never written to after they were rendered, so sharing them is safe.
+def _materialize(src, dest, strategy = "reflink"):
+    if os.path.isfile(dest) and _is_identical(src, dest):
+        return
+
+    # Create file next to destination, and move it to the destination, since
+    # reflinks and hardlinks can't replace an existing file
+    temp = f"{dest}.tmp"
+    for name in strategies[strategies.index(strategy):]:
+        try:
+            if name == "reflink":
+                _reflink(src, temp)
+            elif name == "hardlink":
+                os.link(src, temp)
+            else:
+                copyfile(src, temp)
+
+        # Try next strategy, if not supported by platform or file system
+        except OSError:
+            if os.path.lexists(temp):
+                os.remove(temp)
+            if name == strategies[-1]:
+                raise
+            continue
+
+        # Move file to destination
+        os.replace(temp, dest)
+        return
+
+# Check whether both files have identical contents, comparing sizes first
+def _is_identical(src, dest):
+    if os.path.samefile(src, dest):
+        return True
+
+    # Compare sizes and contents
+    if os.path.getsize(src) != os.path.getsize(dest):
+        return False
+    else:
+        return filecmp.cmp(src, dest, shallow = False)
+
+# Create reflink of file, which shares data with the original file until one
+# of them is written to - only supported on Linux, on Btrfs, XFS and others
+def _reflink(src, dest):
+    if not fcntl or not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "Reflinks are not supported")
+
+    # Clone file into new file
+    with open(src, "rb") as f, open(dest, "wb") as g:
+        fcntl.ioctl(g.fileno(), FICLONE, f.fileno())
+
+# Write data as JSON to the given path - data is written to a temporary file,
+# which is then moved to the given path, so the file is never left truncated
+# if writing is interrupted or the disk is full
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok = True)
+
+    # Write data to temporary file
+    temp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp, "w", encoding = "utf-8") as f:
+            json.dump(data, f, indent = 2, sort_keys = True)
+
+        # Move file to path
+        os.replace(temp, path)
+
+    # Remove temporary file on error
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+# Initialize worker process with a plugin instance that renders social cards,
+# loading the logo once per process - the font is loaded on first use
+def _init_worker(color, font, path, fill):
+    global worker
+    worker = SocialPlugin()
+    worker.color = color
+    worker.font = defaultdict(lambda: font["Regular"], font)
+
+    # Load logo, which is accessed through a promise when rendering
+    worker._resized_logo_promise = concurrent.futures.Future()
+    worker._resized_logo_promise.set_result(
+        worker._load_resized_logo(path, fill)
+    )
+
+# Render social card in worker process and save it to the cache, returning the
+# path, so only the path needs to be sent back to the main process
+def _render_card_in_worker(path, site_name, title, description):
+    image = worker._render_card(site_name, title, description)
+    image.save(path)
+    return path
+
 # -----------------------------------------------------------------------------
 # Data
 # -----------------------------------------------------------------------------
@@ -492,6 +930,15 @@ class SocialPlugin(BasePlugin[SocialConfig]):
 log = logging.getLogger("mkdocs")
 log.addFilter(DuplicateFilter())
 
+# Plugin instance that renders social cards in worker processes
+worker = None
+
+# Strategies to materialize social cards from cache, from cheapest to costliest
+strategies = ["reflink", "hardlink", "copy"]
+
+# Request to clone a file on Linux, see ioctl_ficlone(2)
+FICLONE = 0x40049409
+
 # Color palette
 colors = {
     "red":         { "fill": "#ef5552", "text": "#ffffff" },